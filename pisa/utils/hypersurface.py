@@ -31,8 +31,10 @@ __license__ = '''Copyright (c) 2014-2017, The IceCube Collaboration
 import os
 import collections
 import copy
+from concurrent.futures import ProcessPoolExecutor
 
 import numpy as np
+from numba import jit
 from scipy import interpolate
 from iminuit import Minuit
 from iminuit.iminuit_warnings import HesseFailedWarning
@@ -47,7 +49,6 @@ from pisa.utils.resources import find_resource
 from pisa.utils.fileio import mkdir
 from pisa.utils.log import logging, set_verbosity
 from pisa.utils.comparisons import ALLCLOSE_KW
-from uncertainties import ufloat, correlated_values
 from uncertainties import unumpy as unp
 
 '''
@@ -72,9 +73,52 @@ Hypersurface functional forms
        - Params are then: `p` is scalar (current value of systematic parameter,
          coefficients and `out` are arrays representing the hypersurfaces of all bins
          per bin.
+
+   Each functional form class sets `linear_in_coeffts`, indicating whether the function
+   is a linear combination of its coefficients (in which case its gradient w.r.t. the
+   coefficients does not depend on them). Such functions can be fitted in closed form,
+   see `Hypersurface.fit`.
+
+   `__call__` and `grad` write their results directly to `out` (using the `out`
+   argument of the numpy ufuncs), such that no temporary arrays are created.
+
+   Each functional form class also provides an `accumulate` method, with the same
+   arguments as `__call__`, which adds the result to `out` instead of overwriting it.
+   This is only used in the second case above (scalar `p`, all bins) and is backed by
+   a compiled numba kernel, such that no temporary arrays are created.
 '''
 
 
+@jit(nopython=True, nogil=True, cache=True)
+def _accumulate_linear(p, m, out):
+    for idx in np.ndindex(out.shape):
+        out[idx] += m[idx] * p
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _accumulate_quadratic(p, m1, m2, out):
+    for idx in np.ndindex(out.shape):
+        out[idx] += (m1[idx] + m2[idx] * p) * p
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _accumulate_exponential(p, b, out):
+    for idx in np.ndindex(out.shape):
+        out[idx] += np.expm1(b[idx] * p)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _accumulate_scaled_exponential(p, a, b, out):
+    for idx in np.ndindex(out.shape):
+        out[idx] += (a[idx] + 1.) * np.expm1(b[idx] * p)
+
+
+@jit(nopython=True, nogil=True, cache=True)
+def _accumulate_logarithmic(p, m, out):
+    for idx in np.ndindex(out.shape):
+        out[idx] += np.log1p(m[idx] * p)
+
+
 class linear_hypersurface_func(object):
     '''
     Linear hypersurface functional form
@@ -84,17 +128,17 @@ class linear_hypersurface_func(object):
 
     def __init__(self):
         self.nargs = 1
+        self.linear_in_coeffts = True
 
     def __call__(self, p, m, out):
-        result = m * p
-        np.copyto(src=result, dst=out)
+        np.multiply(m, p, out=out)
+
+    def accumulate(self, p, m, out):
+        _accumulate_linear(p, m, out)
 
     def grad(self, p, m, out):
-        # because m itself is not in the actual calculation, we have to broadcast
-        # manually to yield the same shape as if we had done m*p and added one axis
-        foo = m*p
-        result = np.broadcast_to(p, foo.shape)[..., np.newaxis]
-        np.copyto(src=result, dst=out)
+        # m itself is not in the actual calculation, p is broadcast to the output
+        out[..., 0] = p
 
 
 class quadratic_hypersurface_func(object):
@@ -106,22 +150,24 @@ class quadratic_hypersurface_func(object):
 
     def __init__(self):
         self.nargs = 2
+        self.linear_in_coeffts = True
 
     def __call__(self, p, m1, m2, out):
-        result = m1*p + m2*p**2
-        np.copyto(src=result, dst=out)
+        # Horner form of m1*p + m2*p**2
+        np.multiply(m2, p, out=out)
+        out += m1
+        out *= p
+
+    def accumulate(self, p, m1, m2, out):
+        _accumulate_quadratic(p, m1, m2, out)
+
     # the gradient *must* have all these arguments, even if they are un-used!
 
     def grad(self, p, m1, m2, out):
-        # because m itself is not in the actual calculation, we have to broadcast
-        # manually to yield the same shape as if we had done m*p and stacked on the last
-        # axis
-        foo = m1*p
-        result = np.stack([np.broadcast_to(p, foo.shape),
-                           np.broadcast_to(p**2, foo.shape)],
-                          axis=-1
-                          )
-        np.copyto(src=result, dst=out)
+        # m1, m2 themselves are not in the actual calculation, p is broadcast to the
+        # output
+        out[..., 0] = p
+        np.multiply(out[..., 0], p, out=out[..., 1])
 
 class exponential_hypersurface_func(object):
     '''
@@ -134,16 +180,20 @@ class exponential_hypersurface_func(object):
 
     def __init__(self):
         self.nargs = 1
+        self.linear_in_coeffts = False
 
     def __call__(self, p, b, out):
-        result = np.exp(b*p) - 1.
-        np.copyto(src=result, dst=out)
+        np.multiply(b, p, out=out)
+        np.expm1(out, out=out)
+
+    def accumulate(self, p, b, out):
+        _accumulate_exponential(p, b, out)
 
     def grad(self, p, b, out):
-        # because parameters and coefficients both appear, everything is broadcast
-        # automatically
-        result = np.array([p*np.exp(b*p)])[..., np.newaxis]
-        np.copyto(src=result, dst=out)
+        grad_b = out[..., 0]
+        np.multiply(b, p, out=grad_b)
+        np.exp(grad_b, out=grad_b)
+        grad_b *= p
 
 class scaled_exponential_hypersurface_func(object):
     '''
@@ -158,16 +208,23 @@ class scaled_exponential_hypersurface_func(object):
 
     def __init__(self):
         self.nargs = 2
+        self.linear_in_coeffts = False
 
     def __call__(self, p, a, b, out):
-        result = (a + 1.) * (np.exp(b*p) - 1.)
-        np.copyto(src=result, dst=out)
+        np.multiply(b, p, out=out)
+        np.expm1(out, out=out)
+        out *= a + 1.
+
+    def accumulate(self, p, a, b, out):
+        _accumulate_scaled_exponential(p, a, b, out)
 
     def grad(self, p, a, b, out):
-        # because parameters and coefficients both appear, everything is broadcast
-        # automatically
-        result = np.stack([np.exp(b*p) - 1., (a + 1.)*p*np.exp(b*p)], axis=-1)
-        np.copyto(src=result, dst=out)
+        grad_a, grad_b = out[..., 0], out[..., 1]
+        np.multiply(b, p, out=grad_b)
+        np.expm1(grad_b, out=grad_a)
+        np.exp(grad_b, out=grad_b)
+        grad_b *= p
+        grad_b *= a + 1.
 
 class logarithmic_hypersurface_func(object):
     '''
@@ -182,16 +239,20 @@ class logarithmic_hypersurface_func(object):
 
     def __init__(self):
         self.nargs = 1
+        self.linear_in_coeffts = False
 
     def __call__(self, p, m, out):
-        result = np.log(1 + m*p)
-        np.copyto(src=result, dst=out)
+        np.multiply(m, p, out=out)
+        np.log1p(out, out=out)
+
+    def accumulate(self, p, m, out):
+        _accumulate_logarithmic(p, m, out)
 
     def grad(self, p, m, out):
-        # because parameters and coefficients both appear, everything is broadcast
-        # automatically
-        result = np.array(p/(1 + m*p))[..., np.newaxis]
-        np.copyto(src=result, dst=out)
+        grad_m = out[..., 0]
+        np.multiply(m, p, out=grad_m)
+        grad_m += 1.
+        np.divide(p, grad_m, out=grad_m)
 
 
 # Container holding all possible functions
@@ -552,6 +613,24 @@ class Hypersurface(object):
         The fitted surface is exponentiated during evaluation. Default: False
     '''
 
+    # Attributes stored in the serializable state (in addition to the params)
+    _state_attrs = (
+        "_initialized",
+        "binning",
+        "initial_intercept",
+        "log",
+        "intercept",
+        "intercept_sigma",
+        "fit_complete",
+        "fit_info_stored",
+        "fit_maps_norm",
+        "fit_maps_raw",
+        "fit_chi2",
+        "fit_cov_mat",
+        "fit_method",
+        "using_legacy_data",
+    )
+
     def __init__(self, params, initial_intercept=None, log=False):
 
         # Store args
@@ -575,12 +654,21 @@ class Hypersurface(object):
         self.fit_cov_mat = None
         self.fit_method = None
 
-        # Serialization
-        self._serializable_state = None
-
         # Legacy handling
         self.using_legacy_data = False
 
+    def clone(self):
+        '''
+        Return a new (not yet fitted/initialised) instance with the same definition as
+        this one, e.g. params, initial intercept and log mode. Much cheaper than a deep
+        copy, as none of the fit results are copied.
+        '''
+        return Hypersurface(
+            params=[param.clone() for param in self.params.values()],
+            initial_intercept=self.initial_intercept,
+            log=self.log,
+        )
+
     def _init(self, binning, nominal_param_values):
         '''
         Actually initialise the hypersurface.
@@ -604,7 +692,7 @@ class Hypersurface(object):
         self.intercept = np.full(
             self.binning.shape, self.initial_intercept, dtype=FTYPE)
         self.intercept_sigma = np.full_like(self.intercept, np.NaN)
-        for param in list(self.params.values()):
+        for param in self.params.values():
             param._init_fit_coefft_arrays(self.binning)
 
         #
@@ -613,7 +701,7 @@ class Hypersurface(object):
 
         # Store the nominal param values
         # TODO better checks, including not already set
-        for param in list(self.params.values()):
+        for param in self.params.values():
             param.nominal_value = nominal_param_values[param.name]
 
         #
@@ -649,7 +737,9 @@ class Hypersurface(object):
             Format is :
                 { sys_param_name_0 : sys_param_0_val, ..., sys_param_name_N : sys_param_N_val }.
                 The keys must be string and correspond to the HypersurfaceParam instances.
-                The values must be scalars.
+                The values are typically scalars, but arrays are also allowed and are
+                broadcast against each other. When evaluating all bins, the output then
+                has dimensions [param values ..., binning ...].
 
         bin_idx : tuple or None
             Optionally can specify a particular bin (using numpy indexing). d
@@ -665,14 +755,13 @@ class Hypersurface(object):
         # Check inputs
         #
 
-        # Determine number of sys param values (per sys param)
-        # This will be >1 when fitting, and == 1 when evaluating the hypersurface within the stage
-        num_param_values = np.asarray(list(param_values.values())[0]).size
-
-        # Check same number of values for all sys params
-        for k, v in list(param_values.items()):
-            n = np.asarray(v).size
-            assert n == num_param_values, "All sys params must have the same number of values"
+        # Determine the shape of the sys param values, broadcasting them against each
+        # other (so scalars can be mixed with arrays)
+        # This will have >1 values when fitting, and == 1 when evaluating the hypersurface within the stage
+        try:
+            param_values_shape = np.broadcast(*[np.asarray(v) for v in param_values.values()]).shape
+        except ValueError:
+            raise AssertionError("All sys params must have the same number of values (or be scalars)")
 
         # Determine whether using single bin or not
         single_bin_mode = bin_idx is not None
@@ -685,37 +774,45 @@ class Hypersurface(object):
         # Two possible cases, with limitations on both based on how the sys param functional forms are defined
         if not single_bin_mode:
             # Case 1 : Calculating for all bins simultaneously (e.g. `bin_idx is None`)
-            #          Only support a single scalar value for each systematic parameters
+            #          Typically a single scalar value for each systematic parameters
             #          Use case is evaluating the hypersurfaces during the hypersurface stage
-            assert num_param_values == 1, "Can only provide one value per sys param when evaluating all bins simultaneously"
-            for v in list(param_values.values()):
-                assert np.isscalar(
-                    v), "sys param values must be a scalar when evaluating all bins simultaneously"
-            out_shape = self.binning.shape
+            #          Can also provide arrays of values (e.g. one per dataset), in which
+            #          case the output has dimensions [param values ..., binning ...]
+            out_shape = param_values_shape + self.binning.shape
             bin_idx = Ellipsis
 
         else:
             # Case 2 : Calculating for multiple sys param values, but only a single bin
             #          Use case is fitting the hypersurfaces fucntional form fit params
-            out_shape = (num_param_values,)
+            #          The param values can be arrays of any (common) shape, or scalars
+            out_shape = param_values_shape if param_values_shape else (1,)
 
-        # Create the output array
-        out = np.full(out_shape, np.NaN, dtype=FTYPE)
+        # Create the output array (fully written by the intercept below)
+        out = np.empty(out_shape, dtype=FTYPE)
 
         #
         # Evaluate the hypersurface
         #
 
-        # Start with the intercept
-        for i in range(num_param_values):
-            if single_bin_mode:
-                out[i] = self.intercept[bin_idx]
-            else:
-                np.copyto(src=self.intercept[bin_idx], dst=out[bin_idx])
+        # Start with the intercept (broadcast over the param values in single bin mode)
+        out[...] = self.intercept[bin_idx]
 
-        # Evaluate each individual parameter
-        for k, p in list(self.params.items()):
+        # Get the params once (rather than re-building the list from the dict for each
+        # use below)
+        params = tuple(self.params.items())
+
+        # Get the param values to pass to the functional forms (same order as `params`)
+        # When evaluating all bins for arrays of param values, add dimensions for the
+        # binning such that they broadcast against the coefficients
+        param_vals = []
+        for k, p in params:
             param_val = param_values[k] if self.using_legacy_data else param_values[k] - p.nominal_value
+            if not single_bin_mode and param_values_shape:
+                param_val = np.reshape(param_val, np.shape(param_val) + (1,)*len(self.binning.shape))
+            param_vals.append(param_val)
+
+        # Evaluate each individual parameter
+        for (k, p), param_val in zip(params, param_vals):
             p.evaluate(param_val, out=out, bin_idx=bin_idx)
 
         output_factors = np.exp(out) if self.log else out
@@ -723,23 +820,20 @@ class Hypersurface(object):
         if return_uncertainty:
             # create buffer array for the gradients
             n_coeffs = 1  # start with 1 because intercept is an additional coefficient
-            for param in list(self.params.values()):
-                n_coeffs += param.num_fit_coeffts
-            gradient_buffer = np.full(
-                out_shape + (n_coeffs,), np.NaN, dtype=FTYPE)
+            for k, p in params:
+                n_coeffs += p.num_fit_coeffts
+            # (every element is written below, so no need to initialise)
+            gradient_buffer = np.empty(out_shape + (n_coeffs,), dtype=FTYPE)
             # Start with the intercept, its gradient is always 1
             gradient_buffer[..., 0] = 1.
 
-            # Evaluate gradient each individual parameter and store in buffer.
+            # Evaluate gradient each individual parameter, writing directly to its
+            # slice of the buffer
             i = 1  # start at one because the intercept was already treated
-            for k, p in list(self.params.items()):
-                gbuf = np.full(out_shape + (p.num_fit_coeffts,),
-                               np.NaN, dtype=FTYPE)
-                param_val = param_values[k] if self.using_legacy_data else param_values[k] - p.nominal_value
-                p.gradient(param_val, out=gbuf, bin_idx=bin_idx)
-                for j in range(p.num_fit_coeffts):
-                    gradient_buffer[..., i] = gbuf[..., j]
-                    i += 1
+            for (k, p), param_val in zip(params, param_vals):
+                p.gradient(param_val, out=gradient_buffer[..., i:i+p.num_fit_coeffts],
+                           bin_idx=bin_idx)
+                i += p.num_fit_coeffts
 
             # In log-mode, the output is exponentiated. For the gradient this simply means multiplying
             # with the output itself.
@@ -760,7 +854,7 @@ class Hypersurface(object):
 
     def fit(self, nominal_map, nominal_param_values, sys_maps, sys_param_values,
             norm=True, method="L-BFGS-B", fix_intercept=False, intercept_bounds=None,
-            intercept_sigma=None, include_empty=False):
+            intercept_sigma=None, include_empty=False, fast=False, num_bin_workers=1):
         '''
         Fit the hypersurface coefficients (in every bin) to best match the provided
         nominal and systematic datasets.
@@ -803,6 +897,22 @@ class Hypersurface(object):
             Include empty bins in the fit. If True, empty bins are included with value 0
             and sigma 1.
             Default: False
+
+        fast : bool
+            If there are no bounds on the coefficients, fit all bins at once using
+            batched Levenberg-Marquardt iterations with analytic Jacobians, rather than
+            running the minimizer bin-by-bin. If all functional forms are linear in
+            their coefficients (e.g. "linear" and "quadratic") and not in log mode, this
+            is solved in closed form. Bins that do not converge, or any bounds being
+            defined, fall back to the minimizer.
+            Default: False
+
+        num_bin_workers : int
+            Number of processes to use for fitting the bins with the minimizer in
+            parallel. The default of 1 fits the bins one after the other in this
+            process. Named apart from the `num_workers` arg of `fit_hypersurfaces`
+            (which fits whole maps in parallel), such that it can be passed through
+            that function's `hypersurface_fit_kw`.
         '''
 
         #
@@ -829,6 +939,7 @@ class Hypersurface(object):
 
         assert not (
             include_empty and self.log), "empty bins cannot be included in log mode"
+        assert num_bin_workers >= 1, "'num_bin_workers' must be >= 1"
         #
         # Format things before getting started
         #
@@ -849,24 +960,32 @@ class Hypersurface(object):
 
         # Convert params values from `list of dicts` to `dict of lists`
         param_values_dict = {name: np.array([p[name] for p in param_values])
-                             for name in list(param_values[0].keys())}
+                             for name in param_values[0].keys()}
 
         # Save the param values used for fitting in the param objects (useful for plotting later)
-        for name, values in list(param_values_dict.items()):
+        for name, values in param_values_dict.items():
             self.params[name].fit_param_values = values
 
         # Format the fit `x` values : [ [sys param 0 values], [sys param 1 values], ... ]
         # Order of the params must match the order in `self.params`
         x = np.asarray([param_values_dict[param_name]
-                        for param_name in list(self.params.keys())], dtype=FTYPE)
+                        for param_name in self.params.keys()], dtype=FTYPE)
         # Prepare covariance matrix array
-        self.fit_cov_mat = np.full(
-            list(self.binning.shape)+[self.num_fit_coeffts, self.num_fit_coeffts], np.NaN)
+        # (every bin is written by the fit below, so no need to initialise)
+        self.fit_cov_mat = np.empty(
+            list(self.binning.shape)+[self.num_fit_coeffts, self.num_fit_coeffts],
+            dtype=FTYPE)
 
         #
         # Normalisation
         #
 
+        # Get the bin values (and uncertainties) from all datasets once, as plain float
+        # arrays (rather than operating on the `uncertainties` arrays stored in the maps)
+        # Dimensions are: [fit sets, binning ...]
+        fit_values = np.stack([m.nominal_values for m in maps])
+        fit_sigmas = np.stack([m.std_devs for m in maps])
+
         # All map values are finite, but if have empty bins the nominal map will end up
         # with inf bins in the normalised map (divide by zero). Use a mask to handle
         # this.
@@ -879,17 +998,18 @@ class Hypersurface(object):
             # results can be interpretted as a re-weighting factor, relative to the
             # nominal
 
-            # Formalise, handling inf values
-            normed_maps = []
-            for m in maps:
-                norm_m = copy.deepcopy(m)
-                norm_m.hist[finite_mask] = norm_m.hist[finite_mask] / \
-                    unp.nominal_values(nominal_map.hist[finite_mask])
-                norm_m.hist[~finite_mask] = ufloat(np.NaN, np.NaN)
-                normed_maps.append(norm_m)
+            # Normalise all datasets at once, handling inf values (the nominal values
+            # are treated as exact, so the uncertainties simply scale)
+            nominal_values = fit_values[0].copy()
+            fit_values = np.divide(fit_values, nominal_values, where=finite_mask,
+                                   out=np.full_like(fit_values, np.NaN))
+            fit_sigmas = np.divide(fit_sigmas, np.abs(nominal_values), where=finite_mask,
+                                   out=np.full_like(fit_sigmas, np.NaN))
 
             # Store for plotting later
-            self.fit_maps_norm = normed_maps
+            self.fit_maps_norm = [Map(name=m.name, tex=m.tex, binning=m.binning,
+                                      hist=values, error_hist=sigmas)
+                                  for m, values, sigmas in zip(maps, fit_values, fit_sigmas)]
 
         # Record that fit info is now stored
         self.fit_info_stored = True
@@ -902,26 +1022,156 @@ class Hypersurface(object):
         # sense)
         # TODO hypersurface in general could consider -ve values (no explicitly
         # tied to histograms), so maybe can relax this constraint
-        for m in self.fit_maps:
-            assert np.all(m.nominal_values[finite_mask]
-                          >= 0.), "Found negative bin counts"
+        assert np.all(fit_values[:, finite_mask] >= 0.), "Found negative bin counts"
 
         #
         # Loop over bins
         #
 
-        for bin_idx in np.ndindex(self.binning.shape):  # TODO grab from input map
+        # Flatten the binning dimensions of the bin values (and uncertainties), such
+        # that each bin is addressed by a single integer
+        # Dimensions are: [fit sets, bins]
+        num_bins = int(np.prod(self.binning.shape))
+        y_all = fit_values.reshape(self.num_fit_sets, num_bins).astype(FTYPE)
+        y_sigma_all = fit_sigmas.reshape(self.num_fit_sets, num_bins).astype(FTYPE)
+
+        # Get flat views of the arrays the fit results are written to
+        params = list(self.params.values())
+        intercept_flat = self.intercept.reshape(num_bins)
+        intercept_sigma_flat = self.intercept_sigma.reshape(num_bins)
+        fit_cov_mat_flat = self.fit_cov_mat.reshape(
+            num_bins, self.num_fit_coeffts, self.num_fit_coeffts)
+        # One flat array per param coefficient, ordered as [ param 0 cft 0, ...,
+        # param 0 cft N, ..., param M cft 0, ..., param M cft N ]
+        fit_coeffts_flat = [param.fit_coeffts[..., j].reshape(num_bins)
+                            for param in params for j in range(param.num_fit_coeffts)]
+        fit_coeffts_sigma_flat = [param.fit_coeffts_sigma[..., j].reshape(num_bins)
+                                  for param in params for j in range(param.num_fit_coeffts)]
+
+        # Get the (bin independent) coefficient priors, names and bounds for the fit
+        # once, rather than for every bin
+        # The coefficients are ordered as [ intercept, param 0 cft 0, ..., param 0 cft
+        # N, ..., param M cft 0, ..., param M cft N ]
+        inv_param_sigma = []
+        if intercept_sigma is not None:
+            inv_param_sigma.append(1./intercept_sigma)
+        else:
+            inv_param_sigma.append(0.)
+        for param in params:
+            if param.coeff_prior_sigma is not None:
+                for j in range(param.num_fit_coeffts):
+                    inv_param_sigma.append(
+                        1./param.coeff_prior_sigma[j])
+            else:
+                for j in range(param.num_fit_coeffts):
+                    inv_param_sigma.append(0.)
+        inv_param_sigma = np.array(inv_param_sigma)
+        assert np.all(np.isfinite(
+            inv_param_sigma)), "invalid values found in prior sigma. They must not be zero."
 
-            #
-            # Format this bin's data for fitting
-            #
+        # coefficient names to pass to Minuit. Not strictly necessary
+        coeff_names = [] if fix_intercept else ['intercept']
+        for param in params:
+            for j in range(param.num_fit_coeffts):
+                coeff_names.append(param.name + '_p{:d}'.format(j))
+
+        # Define fit bounds for `minimize`. Bounds are pairs of (min, max)
+        # values for each parameter in the fit. Use 'None' in place of min/max
+        # if there is
+        # no bound in that direction.
+        fit_bounds = []
+        if intercept_bounds is None:
+            fit_bounds.append(tuple([None, None]))
+        else:
+            assert (len(intercept_bounds) == 2) and (
+                np.ndim(intercept_bounds) == 1), "intercept bounds must be given as 2-tuple"
+            fit_bounds.append(intercept_bounds)
+
+        for param in params:
+            if param.bounds is None:
+                fit_bounds.extend(
+                    ((None, None),)*param.num_fit_coeffts)
+            else:
+                if np.ndim(param.bounds) == 1:
+                    assert len(
+                        param.bounds) == 2, "bounds on single coefficients must be given as 2-tuples"
+                    fit_bounds.append(param.bounds)
+                elif np.ndim(param.bounds) == 2:
+                    assert np.all([len(t) == 2 for t in param.bounds]
+                                  ), "bounds must be given as a tuple of 2-tuples"
+                    fit_bounds.extend(param.bounds)
+
+        # Bins to be fitted using the minimizer
+        bins_to_fit = range(num_bins)
+
+        # Solve all bins at once if possible
+        if fast:
+            if self._can_fit_batched(intercept_bounds=intercept_bounds):
+                bins_to_fit = self._fit_batched(
+                    x=x,
+                    y=y_all,
+                    y_sigma=y_sigma_all,
+                    fix_intercept=fix_intercept,
+                    intercept_sigma=intercept_sigma,
+                    include_empty=include_empty,
+                )
+                if len(bins_to_fit) > 0:
+                    logging.debug("Batched fit did not converge in %i bins, re-fitting "
+                                  "these with the minimizer" % len(bins_to_fit))
+            else:
+                logging.debug("Cannot use batched fit for this hypersurface (bounds are "
+                              "defined), falling back to minimizer")
+
+        # If have empty bins, cannot fit In particular, if the nominal map has an empty
+        # bin, it cannot be rescaled (x * 0 = 0) Find these bins (e.g. with NaNs/Infs
+        # in any of the points that would be used for fitting) for all bins at once, and
+        # write empty results for them rather than passing them to the minimizer
+        # TODO also handle missing sigma
+        bad_bin_mask = np.any(~np.isfinite(y_all) & ((y_sigma_all != 0.) | include_empty),
+                              axis=0)
+        bad_bins = np.flatnonzero(bad_bin_mask)
+        if not fix_intercept:
+            intercept_flat[bad_bins] = np.NaN
+            intercept_sigma_flat[bad_bins] = np.NaN
+        for coeffts, coeffts_sigma in zip(fit_coeffts_flat, fit_coeffts_sigma_flat):
+            coeffts[bad_bins] = np.NaN
+            coeffts_sigma[bad_bins] = np.NaN
+        fit_cov_mat_flat[bad_bins] = np.NaN
+        bins_to_fit = np.asarray(bins_to_fit, dtype=int)
+        bins_to_fit = bins_to_fit[~bad_bin_mask[bins_to_fit]]
+
+        # Prepare everything needed to evaluate the hypersurface in a bin once, such
+        # that the loss function called by the minimizer only performs the arithmetic
+        # (no writing to the hypersurface structure, no dict building, no lookups)
+        fit_funcs = [param._hypersurface_func for param in params]
+        fit_param_vals = x if self.using_legacy_data else x - np.array(
+            [param.nominal_value for param in params], dtype=FTYPE)[:, np.newaxis]
+        fit_coefft_slices = []
+        i = 0 if fix_intercept else 1
+        for param in params:
+            fit_coefft_slices.append(slice(i, i+param.num_fit_coeffts))
+            i += param.num_fit_coeffts
+        fixed_intercept = self.initial_intercept if fix_intercept else None
+
+        # Get the fit param guesses for all bins at once
+        # Dimensions are: [bins, fit coeffts], where the coefficients are ordered as
+        # [ intercept, param 0 cft 0, ..., param 0 cft N, ..., param M cft 0, ..., param
+        # M cft N ] (without the intercept if it is fixed)
+        p0_all = np.stack([intercept_flat] + fit_coeffts_flat, axis=-1)
+        if fix_intercept:
+            p0_all = p0_all[:, 1:]
+
+        # Format each bin's data for fitting
+        bin_fit_args = []
+        for flat_idx in bins_to_fit:
+
+            # Get the numpy index of this bin (used for reporting)
+            bin_idx = np.unravel_index(flat_idx, self.binning.shape)
 
             # Format the fit `y` values : [ bin value 0, bin_value 1, ... ]
             # Also get the corresonding uncertainty
-            y = np.asarray([m.nominal_values[bin_idx]
-                            for m in self.fit_maps], dtype=FTYPE)
-            y_sigma = np.asarray([m.std_devs[bin_idx]
-                                  for m in self.fit_maps], dtype=FTYPE)
+            y = y_all[:, flat_idx]
+            y_sigma = y_sigma_all[:, flat_idx].copy()
 
             # Create a mask for keeping all these points
             # May remove some points before fitting if find issues
@@ -940,7 +1190,7 @@ class Hypersurface(object):
                     scan_point_mask = scan_point_mask & ~bad_sigma_mask
 
             # Apply the mask to get the values I will actually use
-            x_to_use = np.array([xx[scan_point_mask] for xx in x])
+            x_to_use = fit_param_vals[:, scan_point_mask]
             y_to_use = y[scan_point_mask]
             y_sigma_to_use = y_sigma[scan_point_mask]
 
@@ -949,200 +1199,74 @@ class Hypersurface(object):
             assert x_to_use.shape[1] == y_to_use.size
 
             # Get flat list of the fit param guesses
-            # The param coefficients are ordered as [ param 0 cft 0, ..., param 0 cft N,
-            # ..., param M cft 0, ..., param M cft N ]
-            p0_intercept = self.intercept[bin_idx]
-            p0_param_coeffts = [param.get_fit_coefft(bin_idx=bin_idx, coefft_idx=i_cft)
-                                for param in list(self.params.values())
-                                for i_cft in range(param.num_fit_coeffts)]
-            if fix_intercept:
-                p0 = np.array(p0_param_coeffts, dtype=FTYPE)
-            else:
-                p0 = np.array([p0_intercept] + p0_param_coeffts, dtype=FTYPE)
-
-            #
-            # Check if have valid data in this bin
-            #
-
-            # If have empty bins, cannot fit In particular, if the nominal map has an
-            # empty bin, it cannot be rescaled (x * 0 = 0) If this case, no need to try
-            # fitting
-
-            # Check if have NaNs/Infs
-            if np.any(~np.isfinite(y_to_use)):  # TODO also handle missing sigma
-
-                # Not fitting, add empty variables
-                popt = np.full_like(p0, np.NaN)
-                pcov = np.NaN
-
-            # Otherwise, fit...
-            else:
+            p0 = p0_all[flat_idx]
+
+            # Must have at least as many sets as free params in fit or else curve_fit will fail
+            assert y.size >= p0.size, "Number of datasets used for fitting (%i) must be >= num free params (%i)" % (
+                y.size, p0.size)
+
+            # Debug logging (first bin only)
+            debug_bin = flat_idx == 0
+            if debug_bin:
+                msg = ">>>>>>>>>>>>>>>>>>>>>>>\n"
+                msg += "Curve fit inputs to bin %s :\n" % (bin_idx,)
+                msg += "  x           : \n%s\n" % x
+                msg += "  y           : \n%s\n" % y
+                msg += "  y sigma     : \n%s\n" % y_sigma
+                msg += "  x used      : \n%s\n" % x_to_use
+                msg += "  y used      : \n%s\n" % y_to_use
+                msg += "  y sigma used: \n%s\n" % y_sigma_to_use
+                msg += "  p0          : %s\n" % p0
+                msg += "  bounds      : \n%s\n" % fit_bounds
+                msg += "  inv sigma   : \n%s\n" % inv_param_sigma
+                msg += "  fit method  : %s\n" % self.fit_method
+                msg += "<<<<<<<<<<<<<<<<<<<<<<<"
+                logging.debug(msg)
+
+            bin_fit_args.append((x_to_use, y_to_use, y_sigma_to_use, p0, fit_funcs,
+                                 fit_coefft_slices, fixed_intercept, self.log,
+                                 inv_param_sigma, fit_bounds, coeff_names, bin_idx,
+                                 debug_bin))
+
+        # Fit the bins
+        # The bins are independent, so can optionally fit them in parallel processes
+        if num_bin_workers > 1 and len(bin_fit_args) > 1:
+            with ProcessPoolExecutor(max_workers=num_bin_workers) as executor:
+                bin_fit_results = list(executor.map(
+                    _fit_bin, *zip(*bin_fit_args),
+                    chunksize=max(1, len(bin_fit_args) // (4 * num_bin_workers))))
+        else:
+            bin_fit_results = [_fit_bin(*args) for args in bin_fit_args]
 
-                #
-                # Fit
-                #
-
-                # Must have at least as many sets as free params in fit or else curve_fit will fail
-                assert y.size >= p0.size, "Number of datasets used for fitting (%i) must be >= num free params (%i)" % (
-                    y.size, p0.size)
-
-                # Define a callback function for use with `curve_fit`
-                #   x : sys params
-                #   p : func/shape params
-                def callback(x, *p):
-
-                    # Note that this is using the dynamic variable `bin_idx`, which
-                    # cannot be passed as an arg as `curve_fit` cannot handle fixed
-                    # parameters.
-                    #
-                    # Unflatten list of the func/shape params, and write them to the
-                    # hypersurface structure
-                    self.intercept[bin_idx] = self.initial_intercept if fix_intercept else p[0]
-                    i = 0 if fix_intercept else 1
-                    for param in list(self.params.values()):
-                        for j in range(param.num_fit_coeffts):
-                            bin_fit_idx = tuple(list(bin_idx) + [j])
-                            param.fit_coeffts[bin_fit_idx] = p[i]
-                            i += 1
-
-                    # Unflatten sys param values
-                    params_unflattened = collections.OrderedDict()
-                    for i in range(len(self.params)):
-                        param_name = list(self.params.keys())[i]
-                        params_unflattened[param_name] = x[i]
-
-                    return self.evaluate(params_unflattened, bin_idx=bin_idx)
-
-                inv_param_sigma = []
-                if intercept_sigma is not None:
-                    inv_param_sigma.append(1./intercept_sigma)
-                else:
-                    inv_param_sigma.append(0.)
-                for param in list(self.params.values()):
-                    if param.coeff_prior_sigma is not None:
-                        for j in range(param.num_fit_coeffts):
-                            inv_param_sigma.append(
-                                1./param.coeff_prior_sigma[j])
-                    else:
-                        for j in range(param.num_fit_coeffts):
-                            inv_param_sigma.append(0.)
-                inv_param_sigma = np.array(inv_param_sigma)
-                assert np.all(np.isfinite(
-                    inv_param_sigma)), "invalid values found in prior sigma. They must not be zero."
-
-                # coefficient names to pass to Minuit. Not strictly necessary
-                coeff_names = [] if fix_intercept else ['intercept']
-                for name, param in self.params.items():
-                    for j in range(param.num_fit_coeffts):
-                        coeff_names.append(name + '_p{:d}'.format(j))
-
-                def loss(p):
-                    '''
-                    Loss to be minimized during the fit.
-                    '''
-                    fvals = callback(x_to_use, *p)
-                    return np.sum(((fvals - y_to_use)/y_sigma_to_use)**2) + np.sum((inv_param_sigma*p)**2)
-
-                # Define fit bounds for `minimize`. Bounds are pairs of (min, max)
-                # values for each parameter in the fit. Use 'None' in place of min/max
-                # if there is
-                # no bound in that direction.
-                fit_bounds = []
-                if intercept_bounds is None:
-                    fit_bounds.append(tuple([None, None]))
-                else:
-                    assert (len(intercept_bounds) == 2) and (
-                        np.ndim(intercept_bounds) == 1), "intercept bounds must be given as 2-tuple"
-                    fit_bounds.append(intercept_bounds)
-
-                for param in self.params.values():
-                    if param.bounds is None:
-                        fit_bounds.extend(
-                            ((None, None),)*param.num_fit_coeffts)
-                    else:
-                        if np.ndim(param.bounds) == 1:
-                            assert len(
-                                param.bounds) == 2, "bounds on single coefficients must be given as 2-tuples"
-                            fit_bounds.append(param.bounds)
-                        elif np.ndim(param.bounds) == 2:
-                            assert np.all([len(t) == 2 for t in param.bounds]
-                                          ), "bounds must be given as a tuple of 2-tuples"
-                            fit_bounds.extend(param.bounds)
-
-                # Define the EPS (step length) used by the fitter Need to take care with
-                # floating type precision, don't want to go smaller than the FTYPE being
-                # used by PISA can handle
-                eps = np.finfo(FTYPE).eps
-
-                # Debug logging
-                test_bin_idx = (0, 0, 0)
-                if bin_idx == test_bin_idx:
-                    msg = ">>>>>>>>>>>>>>>>>>>>>>>\n"
-                    msg += "Curve fit inputs to bin %s :\n" % (bin_idx,)
-                    msg += "  x           : \n%s\n" % x
-                    msg += "  y           : \n%s\n" % y
-                    msg += "  y sigma     : \n%s\n" % y_sigma
-                    msg += "  x used      : \n%s\n" % x_to_use
-                    msg += "  y used      : \n%s\n" % y_to_use
-                    msg += "  y sigma used: \n%s\n" % y_sigma_to_use
-                    msg += "  p0          : %s\n" % p0
-                    msg += "  bounds      : \n%s\n" % fit_bounds
-                    msg += "  inv sigma   : \n%s\n" % inv_param_sigma
-                    msg += "  fit method  : %s\n" % self.fit_method
-                    msg += "<<<<<<<<<<<<<<<<<<<<<<<"
-                    logging.debug(msg)
-
-                # Perform fit
-                # errordef =1 for least squares fit and 0.5 for nllh fit
-                m = Minuit.from_array_func(loss, p0,
-                                           # only initial step size, not very important
-                                           error=(0.1)*len(p0),
-                                           limit=fit_bounds,
-                                           name=coeff_names,
-                                           errordef=1)
-                m.migrad()
-                try:
-                    m.hesse()
-                except HesseFailedWarning as e:
-                    raise Exception(
-                        "Hesse failed for bin %s, cannot determine covariance matrix" % (bin_idx,))
-                popt = m.np_values()
-                pcov = m.np_matrix()
-                if bin_idx == test_bin_idx:
-                    logging.debug(m.get_fmin())
-                    logging.debug(m.get_param_states())
-                    logging.debug(m.covariance)
+        for flat_idx, (popt, pcov) in zip(bins_to_fit, bin_fit_results):
 
             #
             # Re-format fit results
             #
 
-            # Use covariance matrix to get uncertainty in fit parameters Using
-            # uncertainties.correlated_values, and will extract the std dev (including
-            # correlations) shortly Fit may fail to determine covariance matrix
-            # (method-dependent), so only do this if have a finite covariance matrix
-            corr_vals = correlated_values(popt, pcov) if np.all(
+            # Use covariance matrix to get uncertainty in fit parameters (the std dev of
+            # each parameter, marginalised over the others, is the sqrt of the diagonal)
+            # Fit may fail to determine covariance matrix (method-dependent), so only do
+            # this if have a finite covariance matrix
+            popt_sigma = np.sqrt(np.diag(pcov)) if np.all(
                 np.isfinite(pcov)) else None
 
             # Write the fitted param results (and sigma, if available) back to the
             # hypersurface structure
             i = 0
             if not fix_intercept:
-                self.intercept[bin_idx] = popt[i]
-                self.intercept_sigma[bin_idx] = np.NaN if corr_vals is None else corr_vals[i].std_dev
+                intercept_flat[flat_idx] = popt[i]
+                intercept_sigma_flat[flat_idx] = np.NaN if popt_sigma is None else popt_sigma[i]
+                i += 1
+            for coeffts, coeffts_sigma in zip(fit_coeffts_flat, fit_coeffts_sigma_flat):
+                coeffts[flat_idx] = popt[i]
+                coeffts_sigma[flat_idx] = np.NaN if popt_sigma is None else popt_sigma[i]
                 i += 1
-            for param in list(self.params.values()):
-                for j in range(param.num_fit_coeffts):
-                    idx = param.get_fit_coefft_idx(
-                        bin_idx=bin_idx, coefft_idx=j)
-                    param.fit_coeffts[idx] = popt[i]
-                    param.fit_coeffts_sigma[idx] = np.NaN if corr_vals is None else corr_vals[i].std_dev
-                    i += 1
             # Store the covariance matrix
             if fix_intercept and np.all(np.isfinite(pcov)):
-                self.fit_cov_mat[bin_idx] = np.pad(pcov, ((1, 0), (1, 0)))
+                fit_cov_mat_flat[flat_idx] = np.pad(pcov, ((1, 0), (1, 0)))
             else:
-                self.fit_cov_mat[bin_idx] = pcov
+                fit_cov_mat_flat[flat_idx] = pcov
 
         #
         # chi2
@@ -1152,40 +1276,282 @@ class Hypersurface(object):
         # points used for fitting Compute the resulting chi2 to have an estimate of the
         # fit quality
 
-        self.fit_chi2 = []
+        # Get expected bin values according to hypersurface value, evaluating all
+        # datasets at once
+        # Dimensions are: [binning ..., fit sets]
+        predicted = np.moveaxis(self.evaluate(param_values_dict), 0, -1)
 
-        # Loop over datasets
-        for i_set in range(self.num_fit_sets):
+        # Get the observed values
+        observed = np.moveaxis(fit_values, 0, -1)
+        sigma = np.moveaxis(fit_sigmas, 0, -1)
+        # we have to apply the same condition on which values we include
+        # as we did during the fit above
+        if include_empty:
+            sigma[~(sigma > 0.)] = 1.
 
-            # Get expected bin values according tohypersurface value
-            predicted = self.evaluate(
-                {name: values[i_set] for name, values in list(param_values_dict.items())})
+        # Compute chi2 for all bins and datasets in one go
+        with np.errstate(divide='ignore'):
+            self.fit_chi2 = (((predicted - observed) / sigma) ** 2).astype(FTYPE, copy=False)
 
-            # Get the observed value
-            observed = self.fit_maps[i_set].nominal_values
-            sigma = self.fit_maps[i_set].std_devs
-            # we have to apply the same condition on which values we include
-            # as we did during the fit above
-            valid_idx = sigma > 0.
-            if include_empty:
-                sigma[~valid_idx] = 1.
+        #
+        # Done
+        #
+
+        # Record some provenance info about the fits
+        self.fit_complete = True
 
-            # Compute chi2
-            with np.errstate(divide='ignore'):
-                chi2 = ((predicted - observed) / sigma) ** 2
+    def _can_fit_batched(self, intercept_bounds=None):
+        '''
+        Check if the hypersurface can be fitted for all bins at once using
+        `_fit_batched`, e.g. there are no bounds on the coefficients.
 
-            # Add to container
-            self.fit_chi2.append(chi2)
+        Internal function, not to be called by a user.
+        '''
+        if intercept_bounds is not None:
+            return False
+        return all([param.bounds is None for param in self.params.values()])
 
-        # Combine into single array
-        self.fit_chi2 = np.stack(self.fit_chi2, axis=-1).astype(FTYPE)
+    def _is_linear_least_squares(self):
+        '''
+        Check if the hypersurface fit is a linear least squares problem, e.g. all
+        functional forms are linear in their coefficients and not in log mode.
+
+        Internal function, not to be called by a user.
+        '''
+        if self.log:
+            return False
+        return all([param._hypersurface_func.linear_in_coeffts
+                    for param in self.params.values()])
+
+    def _fit_batched(self, x, y, y_sigma, fix_intercept=False, intercept_sigma=None,
+                     include_empty=False, max_iterations=100, tolerance=1e-10):
+        '''
+        Fit all bins at once, for a hypersurface without bounds on the coefficients
+        (see `_can_fit_batched`).
+
+        Minimizes the same loss as the minimizer in `fit`, e.g. the chi2 w.r.t. the data
+        plus the (optional) Gaussian prior penalty on the coefficients, using
+        Levenberg-Marquardt iterations performed simultaneously in every bin. The
+        Jacobian is computed analytically from the gradients of the functional forms.
+
+        If the hypersurface is linear in its coefficients (see
+        `_is_linear_least_squares`), a single Gauss-Newton step solves the problem
+        exactly, e.g. the weighted least squares solution is found in closed form.
+
+        The covariance matrix is the inverse of the (Gauss-Newton approximation of the)
+        Hessian of the chi2 / 2, consistent with `errordef=1` in the minimizer.
+
+        Handles empty bins/points in the same way as the minimizer does.
+
+        Internal function, not to be called by a user.
+
+        Parameters
+        ----------
+        x : array
+            Sys param values, dimensions are: [params, fit sets]
+
+        y, y_sigma : array
+            Bin values and uncertainties, dimensions are: [fit sets, bins (flattened)]
+
+        max_iterations : int
+            Maximum number of Levenberg-Marquardt iterations
+
+        tolerance : float
+            Relative change in the loss below which a bin is considered converged
+
+        Returns
+        -------
+        not_converged : array
+            Flat indices of the bins for which the fit did not converge. The current
+            best coefficients are written for these bins, but they should be re-fitted.
+        '''
+
+        params = list(self.params.values())
+        num_fit_sets, num_bins = y.shape
+        linear = self._is_linear_least_squares()
+
+        # Get the sys param values to pass to the functional forms, with a dimension
+        # added such that they broadcast against the (flattened) bins
+        param_vals = [(x[i] if self.using_legacy_data else x[i] - param.nominal_value)[:, np.newaxis]
+                      for i, param in enumerate(params)]
 
         #
-        # Done
+        # Priors
         #
 
-        # Record some provenance info about the fits
-        self.fit_complete = True
+        # Coefficients are ordered as [ intercept, param 0 cft 0, ..., param M cft N ]
+        free_mask = np.ones(self.num_fit_coeffts, dtype=bool)
+        free_mask[0] = not fix_intercept
+        assert num_fit_sets >= np.sum(free_mask), "Number of datasets used for fitting (%i) must be >= num free params (%i)" % (
+            num_fit_sets, np.sum(free_mask))
+
+        inv_param_sigma = [0. if intercept_sigma is None else 1./intercept_sigma]
+        for param in params:
+            if param.coeff_prior_sigma is None:
+                inv_param_sigma.extend([0.]*param.num_fit_coeffts)
+            else:
+                inv_param_sigma.extend(1./np.asarray(param.coeff_prior_sigma))
+        inv_param_sigma = np.array(inv_param_sigma)[free_mask]
+        assert np.all(np.isfinite(
+            inv_param_sigma)), "invalid values found in prior sigma. They must not be zero."
+        prior = np.diag(inv_param_sigma**2)
+
+        #
+        # Weights
+        #
+
+        # Same treatment of zero sigma points as for the minimizer (e.g. ignore them,
+        # unless including empty bins in which case use a sigma of 1)
+        y_sigma = y_sigma.copy()
+        bad_sigma_mask = y_sigma == 0.
+        if include_empty:
+            y_sigma[bad_sigma_mask] = 1.
+            used_mask = np.ones_like(bad_sigma_mask)
+        else:
+            used_mask = ~bad_sigma_mask
+
+        # Cannot fit bins with non-finite data
+        bad_bin_mask = np.any(~np.isfinite(y) & used_mask, axis=0)
+        used_mask[:, bad_bin_mask] = False
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            weights = np.where(used_mask, 1. / y_sigma**2, 0.)
+        y = np.where(used_mask, y, 0.)
+
+        #
+        # Model
+        #
+
+        def model(coeffts):
+            '''
+            Evaluate the hypersurface and its Jacobian w.r.t. the free coefficients
+            Dimensions are: [fit sets, bins] and [fit sets, bins, free coeffts]
+            '''
+            out = np.empty((num_fit_sets, num_bins), dtype=FTYPE)
+            h = np.empty((num_fit_sets, num_bins), dtype=FTYPE)
+            h[...] = coeffts[:, 0]
+            jac = np.empty((num_fit_sets, num_bins, self.num_fit_coeffts), dtype=FTYPE)
+            jac[..., 0] = 1.
+            i = 1
+            for param, param_val in zip(params, param_vals):
+                args = [coeffts[:, i+j] for j in range(param.num_fit_coeffts)]
+                param._hypersurface_func(param_val, *args, out)
+                h += out
+                param._hypersurface_func.grad(
+                    param_val, *args, jac[..., i:i+param.num_fit_coeffts])
+                i += param.num_fit_coeffts
+            if self.log:
+                with np.errstate(over='ignore'):
+                    h = np.exp(h)
+                jac *= h[..., np.newaxis]
+            return h, jac[..., free_mask]
+
+        def loss(coeffts, h):
+            '''
+            Chi2 + prior penalty in each bin
+            '''
+            with np.errstate(invalid='ignore', over='ignore'):
+                residuals = np.where(used_mask, y - h, 0.)
+                return (np.sum(weights * residuals**2, axis=0)
+                        + np.sum((inv_param_sigma * coeffts[:, free_mask])**2, axis=-1))
+
+        def solve(lhs, rhs):
+            '''
+            Solve the normal equations in all bins (using the pseudo-inverse to be robust
+            against degenerate bins if required)
+            '''
+            try:
+                return np.linalg.solve(lhs, rhs[..., np.newaxis])[..., 0]
+            except np.linalg.LinAlgError:
+                return np.einsum('bkl,bl->bk', np.linalg.pinv(lhs), rhs)
+
+        #
+        # Fit
+        #
+
+        # Start from the initial coefficient values
+        # Dimensions are: [bins, fit coeffts]
+        coeffts = np.empty((num_bins, self.num_fit_coeffts), dtype=FTYPE)
+        coeffts[:, 0] = self.initial_intercept
+        coeffts[:, 1:] = np.concatenate([param.initial_fit_coeffts for param in params])
+
+        h, jac = model(coeffts)
+        current_loss = loss(coeffts, h)
+        damping = np.full(num_bins, 0. if linear else 1.e-3)
+        converged = bad_bin_mask.copy()
+
+        for _ in range(1 if linear else max_iterations):
+
+            active = ~converged
+            if not np.any(active):
+                break
+
+            # Normal equations (including the prior penalty and the damping)
+            weighted_jac = weights[..., np.newaxis] * jac
+            jtwj = np.einsum('sbk,sbl->bkl', weighted_jac, jac) + prior
+            with np.errstate(invalid='ignore'):
+                gradient = (np.einsum('sbk,sb->bk', weighted_jac, np.where(used_mask, y - h, 0.))
+                            - inv_param_sigma**2 * coeffts[:, free_mask])
+            lhs = jtwj + damping[:, np.newaxis, np.newaxis] * (
+                np.eye(jtwj.shape[-1]) * np.diagonal(jtwj, axis1=-2, axis2=-1)[:, np.newaxis, :])
+            lhs[~active] = np.eye(jtwj.shape[-1])
+            gradient[~active] = 0.
+            step = solve(lhs, gradient)
+
+            # Try the step
+            trial_coeffts = coeffts.copy()
+            trial_coeffts[:, free_mask] += step
+            trial_h, trial_jac = model(trial_coeffts)
+            trial_loss = loss(trial_coeffts, trial_h)
+
+            # Accept the steps that reduced the loss (always accept for linear problems,
+            # where the step is the exact solution)
+            with np.errstate(invalid='ignore'):
+                accepted = active & (True if linear else (trial_loss <= current_loss))
+                small_change = (current_loss - trial_loss) <= tolerance * (1. + np.abs(trial_loss))
+                small_step = np.all(np.abs(step) <= tolerance * (1. + np.abs(coeffts[:, free_mask])), axis=-1)
+            coeffts[accepted] = trial_coeffts[accepted]
+            h[:, accepted] = trial_h[:, accepted]
+            jac[:, accepted] = trial_jac[:, accepted]
+
+            # Converged once the loss no longer improves (or the step becomes tiny)
+            converged |= (accepted & small_change) | (active & small_step)
+            if linear:
+                converged |= accepted
+            current_loss = np.where(accepted, trial_loss, current_loss)
+            damping = np.where(accepted, damping / 10., damping * 10.)
+
+        # Covariance matrix from the final Jacobian
+        weighted_jac = weights[..., np.newaxis] * jac
+        cov = np.full((num_bins, self.num_fit_coeffts, self.num_fit_coeffts), np.NaN, dtype=FTYPE)
+        cov[np.ix_(np.arange(num_bins), free_mask, free_mask)] = np.linalg.pinv(
+            np.einsum('sbk,sbl->bkl', weighted_jac, jac) + prior)
+        if fix_intercept:
+            cov[:, 0, :] = 0.
+            cov[:, :, 0] = 0.
+        coeffts_sigma = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+
+        coeffts[bad_bin_mask, :] = np.NaN
+        coeffts[bad_bin_mask, 0] = self.initial_intercept if fix_intercept else np.NaN
+        coeffts_sigma[bad_bin_mask] = np.NaN
+        cov[bad_bin_mask] = np.NaN
+
+        #
+        # Write results
+        #
+
+        if not fix_intercept:
+            self.intercept[...] = coeffts[:, 0].reshape(self.binning.shape)
+            self.intercept_sigma[...] = coeffts_sigma[:, 0].reshape(self.binning.shape)
+        i = 1
+        for param in params:
+            for j in range(param.num_fit_coeffts):
+                param.fit_coeffts[..., j] = coeffts[:, i].reshape(self.binning.shape)
+                param.fit_coeffts_sigma[..., j] = coeffts_sigma[:, i].reshape(self.binning.shape)
+                i += 1
+        self.fit_cov_mat[...] = cov.reshape(self.fit_cov_mat.shape)
+
+        return np.flatnonzero(~converged)
 
     @property
     def nominal_values(self):
@@ -1195,7 +1561,7 @@ class Hypersurface(object):
         '''
         assert self.fit_info_stored, "Cannot get fit dataset nominal values, fit info not stored%s" % (
             " (using legacy data)" if self.using_legacy_data else "")
-        return collections.OrderedDict([(name, param.nominal_value) for name, param in list(self.params.items())])
+        return collections.OrderedDict([(name, param.nominal_value) for name, param in self.params.items()])
 
     @property
     def fit_param_values(self):
@@ -1205,7 +1571,30 @@ class Hypersurface(object):
         '''
         assert self.fit_info_stored, "Cannot get fit dataset param values, fit info not stored%s" % (
             " (using legacy data)" if self.using_legacy_data else "")
-        return collections.OrderedDict([(name, param.fit_param_values) for name, param in list(self.params.items())])
+        return collections.OrderedDict([(name, param.fit_param_values) for name, param in self.params.items()])
+
+    def _get_param_nominal_masks(self):
+        '''
+        Return a mask indicating, for each parameter and dataset, whether the dataset
+        was generated using the nominal value of the parameter
+        Dimensions are: [params, fit sets]
+
+        Internal function, not to be called by a user.
+        '''
+
+        fit_param_values = np.stack([param.fit_param_values for param in self.params.values()])
+        nominal_values = np.array([param.nominal_value for param in self.params.values()])[:, np.newaxis]
+
+        # Values usually come from the same config scalars as the nominal values, so try
+        # exact equality first and only fall back to `isclose` for the remaining entries
+        masks = fit_param_values == nominal_values
+        if not np.all(masks):
+            not_equal = ~masks
+            masks[not_equal] = np.isclose(
+                fit_param_values[not_equal],
+                np.broadcast_to(nominal_values, fit_param_values.shape)[not_equal],
+            )
+        return masks
 
     def get_nominal_mask(self):
         '''
@@ -1215,13 +1604,7 @@ class Hypersurface(object):
         assert self.fit_info_stored, "Cannot get nominal mask, fit info not stored%s" % (
             " (using legacy data)" if self.using_legacy_data else "")
 
-        nom_mask = np.ones((self.num_fit_sets,), dtype=bool)
-
-        for param in list(self.params.values()):
-            nom_mask = nom_mask & np.isclose(
-                param.fit_param_values, param.nominal_value)
-
-        return nom_mask
+        return np.all(self._get_param_nominal_masks(), axis=0)
 
     def get_on_axis_mask(self, param_name):
         '''
@@ -1241,19 +1624,9 @@ class Hypersurface(object):
 
         assert param_name in self.param_names
 
-        on_axis_mask = np.ones((self.num_fit_sets,), dtype=bool)
-
-        # Loop over sys params
-        for param in list(self.params.values()):
-
-            # Ignore the chosen param
-            if param.name != param_name:
-
-                # Define a "nominal" mask
-                on_axis_mask = on_axis_mask & np.isclose(
-                    param.fit_param_values, param.nominal_value)
-
-        return on_axis_mask
+        # Require all other sys params to be nominal
+        other_params_mask = np.array([name != param_name for name in self.param_names])
+        return np.all(self._get_param_nominal_masks()[other_params_mask], axis=0)
 
     def report(self, bin_idx=None):
         '''
@@ -1265,21 +1638,24 @@ class Hypersurface(object):
             Specify a particular bin (using numpy indexing). In this case only report on that bin.
         '''
 
-        msg = ""
+        # Collect the lines of the message and join them at the end (rather than
+        # growing a string, which is slow for many bins)
+        msg = []
 
         # Fit results
-        msg += ">>>>>> Fit coefficients >>>>>>" + "\n"
+        msg.append(">>>>>> Fit coefficients >>>>>>")
+        params = tuple(self.params.values())
         bin_indices = np.ndindex(
             self.binning.shape) if bin_idx is None else [bin_idx]
         for bin_idx in bin_indices:
-            msg += "  Bin %s :" % (bin_idx,) + "\n"
-            msg += "     Intercept : %0.5g" % (self.intercept[bin_idx],) + "\n"
-            for param in list(self.params.values()):
-                msg += "     %s : %s" % (param.name, ", ".join(["%0.5g" % param.get_fit_coefft(
-                    bin_idx=bin_idx, coefft_idx=cft_idx) for cft_idx in range(param.num_fit_coeffts)])) + "\n"
-        msg += "<<<<<< Fit coefficients <<<<<<" + "\n"
+            msg.append("  Bin %s :" % (bin_idx,))
+            msg.append("     Intercept : %0.5g" % (self.intercept[bin_idx],))
+            for param in params:
+                msg.append("     %s : %s" % (param.name, ", ".join(
+                    ["%0.5g" % c for c in param.fit_coeffts[bin_idx]])))
+        msg.append("<<<<<< Fit coefficients <<<<<<")
 
-        return msg
+        return "\n".join(msg) + "\n"
 
     def __str__(self):
         return self.report()
@@ -1309,7 +1685,7 @@ class Hypersurface(object):
         Return the total number of coefficients in the hypersurface fit
         This is the overall intercept, plus the coefficients for each individual param
         '''
-        return int(1 + np.sum([param.num_fit_coeffts for param in list(self.params.values())]))
+        return 1 + sum(param.num_fit_coeffts for param in self.params.values())
 
     @property
     def fit_coeffts(self):
@@ -1319,11 +1695,13 @@ class Hypersurface(object):
         Dimensions are: [binning ..., fit coeffts]
         '''
 
-        array = [self.intercept]
-        for param in list(self.params.values()):
-            for i in range(param.num_fit_coeffts):
-                array.append(param.get_fit_coefft(coefft_idx=i))
-        array = np.stack(array, axis=-1)
+        # Fill a single output array, copying all coefficients of each param at once
+        array = np.empty(self.intercept.shape + (self.num_fit_coeffts,), dtype=FTYPE)
+        array[..., 0] = self.intercept
+        n = 1
+        for param in self.params.values():
+            array[..., n:n+param.num_fit_coeffts] = param.fit_coeffts
+            n += param.num_fit_coeffts
         return array
 
     @fit_coeffts.setter
@@ -1333,21 +1711,20 @@ class Hypersurface(object):
         of the hypersurface in the same order in which they are also
         returned by the getter.
         '''
-        assert fit_coeffts.shape == self.fit_coeffts.shape, "incorrect shape of coefficients"
+        assert fit_coeffts.shape == self.intercept.shape + (self.num_fit_coeffts,), \
+            "incorrect shape of coefficients"
         self.intercept = fit_coeffts[..., 0]
         n = 1
         for param in self.params.values():
-            for i in range(param.num_fit_coeffts):
-                idx = param.get_fit_coefft_idx(coefft_idx=i)
-                param.fit_coeffts[idx] = fit_coeffts[..., n]
-                n += 1
+            param.fit_coeffts[...] = fit_coeffts[..., n:n+param.num_fit_coeffts]
+            n += param.num_fit_coeffts
 
     @property
     def fit_coefft_labels(self):
         '''
         Return labels for each fit coefficient
         '''
-        return ["intercept"] + ["%s p%i" % (param.name, i) for param in list(self.params.values()) for i in range(param.num_fit_coeffts)]
+        return ["intercept"] + ["%s p%i" % (param.name, i) for param in self.params.values() for i in range(param.num_fit_coeffts)]
 
     @property
     def serializable_state(self):
@@ -1355,32 +1732,15 @@ class Hypersurface(object):
         OrderedDict containing savable state attributes
         """
 
-        if self._serializable_state is None:  # TODO always redo?
-
-            state = collections.OrderedDict()
-
-            state["_initialized"] = self._initialized
-            state["binning"] = self.binning.serializable_state
-            state["initial_intercept"] = self.initial_intercept
-            state["log"] = self.log
-            state["intercept"] = self.intercept
-            state["intercept_sigma"] = self.intercept_sigma
-            state["fit_complete"] = self.fit_complete
-            state["fit_info_stored"] = self.fit_info_stored
-            state["fit_maps_norm"] = self.fit_maps_norm
-            state["fit_maps_raw"] = self.fit_maps_raw
-            state["fit_chi2"] = self.fit_chi2
-            state["fit_cov_mat"] = self.fit_cov_mat
-            state["fit_method"] = self.fit_method
-            state["using_legacy_data"] = self.using_legacy_data
-
-            state["params"] = collections.OrderedDict()
-            for name, param in list(self.params.items()):
-                state["params"][name] = param.serializable_state
+        state = collections.OrderedDict()
+        for attr in self._state_attrs:
+            state[attr] = getattr(self, attr)
+        state["binning"] = self.binning.serializable_state
+        state["params"] = collections.OrderedDict()
+        for name, param in self.params.items():
+            state["params"][name] = param.serializable_state
 
-            self._serializable_state = state
-
-        return self._serializable_state
+        return state
 
     @classmethod
     def from_state(cls, state):
@@ -1414,7 +1774,7 @@ class Hypersurface(object):
 
         # Loop through params in the state
         params_state = state.pop("params")
-        for param_name, param_state in list(params_state.items()):
+        for param_name, param_state in params_state.items():
 
             # Create the param
             param = HypersurfaceParam(
@@ -1424,8 +1784,8 @@ class Hypersurface(object):
             )
 
             # Define rest of state
-            for k in list(param_state.keys()):
-                setattr(param, k, param_state.pop(k))
+            for k, v in param_state.items():
+                setattr(param, k, v)
 
             # Store
             params.append(param)
@@ -1452,8 +1812,18 @@ class Hypersurface(object):
             Map(**map_state) for map_state in fit_maps_norm]
 
         # Define rest of state
-        for k in list(state.keys()):
-            setattr(hypersurface, k, state.pop(k))
+        for k, v in state.items():
+            setattr(hypersurface, k, v)
+
+        # Use PISA's floating point precision for the fit results, regardless of the
+        # precision used when they were stored (the param coefficients are handled by
+        # the `HypersurfaceParam.fit_coeffts` setter)
+        for k in ["intercept", "intercept_sigma", "fit_cov_mat"]:
+            if getattr(hypersurface, k, None) is not None:
+                setattr(hypersurface, k, np.asarray(getattr(hypersurface, k), dtype=FTYPE))
+        for param in hypersurface.params.values():
+            if param.fit_coeffts_sigma is not None:
+                param.fit_coeffts_sigma = np.asarray(param.fit_coeffts_sigma, dtype=FTYPE)
 
         return hypersurface
 
@@ -1493,6 +1863,21 @@ class HypersurfaceParam(object):
         will be applied during the fit.
     '''
 
+    # Attributes stored in the serializable state
+    _state_attrs = (
+        "name",
+        "func_name",
+        "num_fit_coeffts",
+        "fit_coeffts",
+        "fit_coeffts_sigma",
+        "initial_fit_coeffts",
+        "fitted",
+        "fit_param_values",
+        "binning_shape",
+        "nominal_value",
+        "bounds",
+    )
+
     def __init__(self, name, func_name, initial_fit_coeffts=None, bounds=None, coeff_prior_sigma=None):
 
         # Store basic members
@@ -1514,8 +1899,8 @@ class HypersurfaceParam(object):
         # Placeholder for nominal value
         self.nominal_value = None
 
-        # Serialization
-        self._serializable_state = None
+        # Scratch array used when evaluating single bins
+        self._scratch_out = None
 
         #
         # Init the functional form
@@ -1542,6 +1927,20 @@ class HypersurfaceParam(object):
             assert self.initial_fit_coeffts.size == self.num_fit_coeffts, "'initial_fit_coeffts' should have %i values, found %i" % (
                 self.num_fit_coeffts, self.initial_fit_coeffts.size)
 
+    def clone(self):
+        '''
+        Return a new (not yet fitted) instance with the same definition as this one,
+        e.g. name, functional form, initial values, bounds and priors. Much cheaper
+        than a deep copy, as none of the fit results are copied.
+        '''
+        return HypersurfaceParam(
+            name=self.name,
+            func_name=self.func_name,
+            initial_fit_coeffts=np.copy(self.initial_fit_coeffts),
+            bounds=copy.deepcopy(self.bounds),
+            coeff_prior_sigma=copy.deepcopy(self.coeff_prior_sigma),
+        )
+
     def _get_hypersurface_func(self, func_name):
         '''
         Find the function defining the hypersurface functional form.
@@ -1567,18 +1966,16 @@ class HypersurfaceParam(object):
         Internal function, not to be called by a user.
         '''
 
-        arrays = []
-
         self.binning_shape = binning.shape
 
-        for fit_coefft_initial_value in self.initial_fit_coeffts:
-
-            fit_coefft_array = np.full(
-                self.binning_shape, fit_coefft_initial_value, dtype=FTYPE)
-            arrays.append(fit_coefft_array)
-
-        self.fit_coeffts = np.stack(arrays, axis=-1)
-        self.fit_coeffts_sigma = np.full_like(self.fit_coeffts, np.NaN)
+        # Stored coefficient-major (see `fit_coeffts` setter), so allocate the buffer in
+        # that layout (the setter then uses it without copying) and broadcast the initial
+        # values into it in one go
+        buffer = np.empty((self.num_fit_coeffts,) + tuple(self.binning_shape), dtype=FTYPE)
+        buffer[...] = np.reshape(np.asarray(self.initial_fit_coeffts, dtype=FTYPE),
+                                 (-1,) + (1,)*len(self.binning_shape))
+        self.fit_coeffts = np.moveaxis(buffer, 0, -1)
+        self.fit_coeffts_sigma = np.full(self.fit_coeffts.shape, np.NaN, dtype=FTYPE)
 
     def evaluate(self, param, out, bin_idx=None):
         '''
@@ -1589,18 +1986,23 @@ class HypersurfaceParam(object):
         when fitting).
         '''
 
-        # Create an array to file with this contorubtion
-        this_out = np.full_like(out, np.NaN, dtype=FTYPE)
+        # When evaluating all bins for a single param value, add the contribution to
+        # `out` directly using the compiled kernel
+        if ((bin_idx is Ellipsis) or (bin_idx is None)) and np.ndim(param) == 0:
+            self._hypersurface_func.accumulate(param, *self._fit_coefft_views, out)
+            return
 
-        # Form the arguments to pass to the functional form
-        # Need to be flexible in terms of the number of fit parameters
-        args = [param]
-        for cft_idx in range(self.num_fit_coeffts):
-            args += [self.get_fit_coefft(bin_idx=bin_idx, coefft_idx=cft_idx)]
-        args += [this_out]
+        # Get an array to fill with this contribution, reusing the scratch array from
+        # previous calls where possible (e.g. when fitting, this is called repeatedly
+        # with the same shape). Every element is written by the functional form, so no
+        # need to initialise.
+        this_out = self._scratch_out
+        if this_out is None or this_out.shape != np.shape(out):
+            this_out = np.empty_like(out, dtype=FTYPE)
+            self._scratch_out = this_out
 
-        # Call the function
-        self._hypersurface_func(*args)
+        # Call the function, passing one argument per fit coefficient
+        self._hypersurface_func(param, *self._get_fit_coefft_args(bin_idx), this_out)
 
         # Add to overall hypersurface result
         out += this_out
@@ -1612,25 +2014,64 @@ class HypersurfaceParam(object):
 
         By default evaluates all bins, but optionally can specify a particular bin (used when fitting).
         '''
-        # Create an array to fill with the gradient
-        this_out = np.full_like(out, np.NaN, dtype=FTYPE)
+        # Call the function, passing one argument per fit coefficient
+        # The function writes every element of `out`, so no intermediate array is needed
+        self._hypersurface_func.grad(param, *self._get_fit_coefft_args(bin_idx), out)
 
-        # Form the arguments to pass to the functional form
-        # Need to be flexible in terms of the number of fit parameters
-        args = [param]
-        for cft_idx in range(self.num_fit_coeffts):
-            args += [self.get_fit_coefft(bin_idx=bin_idx, coefft_idx=cft_idx)]
-        args += [this_out]
+    def _get_fit_coefft_args(self, bin_idx=None):
+        '''
+        Get the fit coefficients to pass to the functional form, as a list with one
+        entry per coefficient. Uses the cached per-coefficient views of
+        `self.fit_coeffts` rather than building an index for each one.
 
-        # Call the function
-        self._hypersurface_func.grad(*args)
-        # Copy to wherever the gradient is to be stored
-        np.copyto(src=this_out, dst=out)
+        Internal function, not to be called by a user.
+        '''
+        if (bin_idx is Ellipsis) or (bin_idx is None):
+            return self._fit_coefft_views
+        return [view[bin_idx] for view in self._fit_coefft_views]
+
+    @property
+    def fit_coeffts(self):
+        '''
+        Fit coefficients array, with shape (binning shape ..., num fit coeffts)
+        '''
+        return self._fit_coeffts
+
+    @fit_coeffts.setter
+    def fit_coeffts(self, fit_coeffts):
+        # The values are copied into a coefficient-major buffer, such that each
+        # coefficient is contiguous in memory, and `fit_coeffts` is exposed as a view of
+        # this with the coefficient as the last axis (writes to it go to the buffer)
+        if fit_coeffts is None:
+            self._fit_coeffts = None
+            self._fit_coefft_views = None
+        else:
+            buffer = np.ascontiguousarray(np.moveaxis(fit_coeffts, -1, 0), dtype=FTYPE)
+            self._fit_coeffts = np.moveaxis(buffer, 0, -1)
+            # Keep a view per coefficient, used when evaluating the functional form
+            self._fit_coefft_views = list(buffer)
+
+    def __getstate__(self):
+        # The coefficient views would become detached copies when pickling/copying,
+        # so drop them here and rebuild them from the coefficients array (and there is
+        # no need to carry the scratch array around either)
+        state = self.__dict__.copy()
+        state.pop("_fit_coefft_views", None)
+        state["_scratch_out"] = None
+        return state
+
+    def __setstate__(self, state):
+        fit_coeffts = state.pop("_fit_coeffts", None)
+        self.__dict__.update(state)
+        self.fit_coeffts = fit_coeffts
 
     def get_fit_coefft_idx(self, bin_idx=None, coefft_idx=None):
         '''
         Indexing the fit_coefft matrix is a bit of a pain
         This helper function eases things
+
+        Deprecated: index `fit_coeffts` directly, e.g. `fit_coeffts[bin_idx + (i,)]`.
+        Kept for backwards compatibility, not used internally.
         '''
 
         # TODO can probably do this more cleverly with numpy indexing, but works for now...
@@ -1657,6 +2098,9 @@ class HypersurfaceParam(object):
         '''
         Get a fit coefficient values from the matrix
         Basically just wrapping the indexing function
+
+        Deprecated: index `fit_coeffts` directly. Kept for backwards compatibility, not
+        used internally.
         '''
         idx = self.get_fit_coefft_idx(*args, **kwargs)
         return self.fit_coeffts[idx]
@@ -1667,23 +2111,11 @@ class HypersurfaceParam(object):
         OrderedDict containing savable state attributes
         """
 
-        if self._serializable_state is None:  # TODO always redo?
+        state = collections.OrderedDict()
+        for attr in self._state_attrs:
+            state[attr] = getattr(self, attr)
 
-            state = collections.OrderedDict()
-            state["name"] = self.name
-            state["func_name"] = self.func_name
-            state["num_fit_coeffts"] = self.num_fit_coeffts
-            state["fit_coeffts"] = self.fit_coeffts
-            state["fit_coeffts_sigma"] = self.fit_coeffts_sigma
-            state["initial_fit_coeffts"] = self.initial_fit_coeffts
-            state["fitted"] = self.fitted
-            state["fit_param_values"] = self.fit_param_values
-            state["binning_shape"] = self.binning_shape
-            state["nominal_value"] = self.nominal_value
-            state["bounds"] = self.bounds
-            self._serializable_state = state
-
-        return self._serializable_state
+        return state
 
 
 '''
@@ -1704,8 +2136,162 @@ def get_hypersurface_file_name(hypersurface, tag):
     return output_file
 
 
+def _fit_bin(x, y, y_sigma, p0, funcs, coefft_slices, fixed_intercept, log,
+             inv_param_sigma, fit_bounds, coeff_names, bin_idx, debug=False):
+    '''
+    Fit the hypersurface coefficients in a single bin using the minimizer. Module-level
+    such that it can be run in a worker process by `Hypersurface.fit`.
+
+    `x` are the sys param values (relative to the nominal values, unless using legacy
+    data) with dimensions [params, fit sets], `y` and `y_sigma` the bin values and
+    uncertainties for these fit sets, `funcs` the functional form of each param and
+    `coefft_slices` the elements of the flat list of coefficients belonging to each
+    param. `fixed_intercept` is the intercept value to use if it is not fitted (else
+    None).
+
+    Returns the best fit coefficients and their covariance matrix. The bin values
+    must be finite (bins that cannot be fitted are handled by the caller).
+
+    Internal function, not to be called by a user.
+    '''
+
+    # Buffers for evaluating the hypersurface
+    func_out = np.empty(y.shape, dtype=FTYPE)
+    bin_out = np.empty(y.shape, dtype=FTYPE)
+
+    def callback(p):
+        '''
+        Evaluate the hypersurface in this bin for the sys param values used in the fit,
+        given the flat list of func/shape params `p`
+        '''
+        bin_out[...] = p[0] if fixed_intercept is None else fixed_intercept
+        for func, param_val, coefft_slice in zip(funcs, x, coefft_slices):
+            func(param_val, *p[coefft_slice], func_out)
+            np.add(bin_out, func_out, out=bin_out)
+        return np.exp(bin_out) if log else bin_out
+
+    def loss(p):
+        '''
+        Loss to be minimized during the fit.
+        '''
+        fvals = callback(p)
+        return np.sum(((fvals - y)/y_sigma)**2) + np.sum((inv_param_sigma*p)**2)
+
+    # Buffer for the Jacobian of the hypersurface w.r.t. the func/shape params
+    # Dimensions are: [fit sets, func/shape params]
+    # The intercept (if fitted) enters linearly, so its column is constant
+    jac = np.empty(y.shape + p0.shape, dtype=FTYPE)
+    if fixed_intercept is None:
+        jac[:, 0] = 1.
+
+    def loss_grad(p):
+        '''
+        Analytic gradient of the loss w.r.t. the func/shape params, using the gradients
+        of the functional forms (rather than having the minimizer use finite
+        differences)
+        '''
+        fvals = callback(p)
+        for func, param_val, coefft_slice in zip(funcs, x, coefft_slices):
+            func.grad(param_val, *p[coefft_slice], jac[:, coefft_slice])
+        # In log mode, the output is exponentiated (chain rule)
+        fvals_jac = fvals[:, np.newaxis] * jac if log else jac
+        return 2. * np.dot((fvals - y) / y_sigma**2, fvals_jac) + 2. * inv_param_sigma**2 * p
+
+    # Perform fit
+    # errordef =1 for least squares fit and 0.5 for nllh fit
+    m = Minuit.from_array_func(loss, p0,
+                               # only initial step size, not very important
+                               error=(0.1)*len(p0),
+                               limit=fit_bounds,
+                               name=coeff_names,
+                               grad=loss_grad,
+                               errordef=1)
+    m.migrad()
+    try:
+        m.hesse()
+    except HesseFailedWarning as e:
+        raise Exception(
+            "Hesse failed for bin %s, cannot determine covariance matrix" % (bin_idx,))
+    if debug:
+        logging.debug(m.get_fmin())
+        logging.debug(m.get_param_states())
+        logging.debug(m.covariance)
+
+    return m.np_values(), m.np_matrix()
+
+
+def _fit_single_map(nominal_map, nominal_param_values, sys_maps, sys_param_values, params,
+                    log, hypersurface_fit_kw):
+    '''
+    Create and fit the hypersurface for a single map. Module-level such that it can be
+    run in a worker process by `fit_hypersurfaces`.
+
+    Internal function, not to be called by a user.
+    '''
+
+    # Create the hypersurface
+    hypersurface = Hypersurface(
+        params=[param.clone() for param in params],
+        initial_intercept=0. if log else 1.,  # Initial value for intercept
+        log=log
+    )
+
+    # Perform fit
+    hypersurface.fit(
+        nominal_map=nominal_map,
+        nominal_param_values=nominal_param_values,
+        sys_maps=sys_maps,
+        sys_param_values=sys_param_values,
+        norm=True,
+        **hypersurface_fit_kw
+    )
+
+    return hypersurface
+
+
+def _fit_mapsets(nominal_mapset, nominal_param_values, sys_mapsets, sys_param_values,
+                 params, log, num_workers, hypersurface_fit_kw):
+    '''
+    Fit a hypersurface to each map of the nominal and systematics mapsets, optionally
+    in parallel processes. Returns an OrderedDict of hypersurfaces keyed by map name.
+
+    Internal function, not to be called by a user (see `fit_hypersurfaces`).
+    '''
+
+    # Create the container to fill
+    hypersurfaces = collections.OrderedDict()
+
+    # Prepare the fit inputs for each map
+    map_names = nominal_mapset.names
+    fit_args = []
+    for map_name in map_names:
+        nominal_map = nominal_mapset[map_name]
+        sys_maps = [sys_mapset[map_name] for sys_mapset in sys_mapsets]
+
+        fit_args.append((nominal_map, nominal_param_values, sys_maps, sys_param_values,
+                         params, log, hypersurface_fit_kw))
+
+    # Fit the hypersurface for each map
+    # The maps are independent, so can optionally fit them in parallel processes
+    if num_workers > 1:
+        with ProcessPoolExecutor(max_workers=num_workers) as executor:
+            fitted = list(executor.map(_fit_single_map, *zip(*fit_args)))
+    else:
+        fitted = [_fit_single_map(*args) for args in fit_args]
+
+    for map_name, hypersurface in zip(map_names, fitted):
+
+        # Report the results
+        logging.debug("\nFitted hypersurface report:\n%s" % hypersurface)
+
+        # Store for later write to disk
+        hypersurfaces[map_name] = hypersurface
+
+    return hypersurfaces
+
+
 def fit_hypersurfaces(nominal_dataset, sys_datasets, params, output_dir, tag, combine_regex=None,
-                      log=True, **hypersurface_fit_kw):
+                      log=True, num_workers=1, **hypersurface_fit_kw):
     '''
     A helper function that a user can use to fit hypersurfaces to a bunch of simulation
     datasets, and save the results to a file. Basically a wrapper of Hypersurface.fit,
@@ -1753,6 +2339,13 @@ def fit_hypersurfaces(nominal_dataset, sys_datasets, params, output_dir, tag, co
         `MapSet.combine_re` function (see that functions docs for more details). Choose
         `None` is do not want to perform this merging.
 
+    num_workers : int
+        Number of processes to use for fitting the maps in parallel. The default of 1
+        fits the maps one after the other in this process. To instead fit the bins of
+        each map in parallel, pass `num_bin_workers` (see `Hypersurface.fit`) via
+        `hypersurface_fit_kw`. The two are mutually exclusive, to avoid nesting
+        process pools.
+
     hypersurface_fit_kw : kwargs
         kwargs will be passed on to the calls to `Hypersurface.fit`
     '''
@@ -1769,7 +2362,6 @@ def fit_hypersurfaces(nominal_dataset, sys_datasets, params, output_dir, tag, co
     # Useful for cases where this function is called in a loop (e.g. leave-one-out tests)
     nominal_dataset = copy.deepcopy(nominal_dataset)
     sys_datasets = copy.deepcopy(sys_datasets)
-    params = copy.deepcopy(params)
 
     #
     # Check inputs
@@ -1795,6 +2387,13 @@ def fit_hypersurfaces(nominal_dataset, sys_datasets, params, output_dir, tag, co
     for p in params:
         assert isinstance(p, HypersurfaceParam)
 
+    # Use fresh copies of the params (cheaper than a deep copy)
+    params = [param.clone() for param in params]
+
+    assert num_workers >= 1, "'num_workers' must be >= 1"
+    assert num_workers == 1 or hypersurface_fit_kw.get("num_bin_workers", 1) == 1, \
+        "'num_workers' and 'num_bin_workers' cannot both be > 1"
+
     # Report inputs
     msg = "Hypersurface fit details :"
     msg += "  Num params            : %i" % len(params)
@@ -1831,50 +2430,16 @@ def fit_hypersurfaces(nominal_dataset, sys_datasets, params, output_dir, tag, co
     # Loop over maps
     #
 
-    # Create the container to fill
-    hypersurfaces = collections.OrderedDict()
-
-    # Loop over maps
-    for map_name in nominal_dataset["mapset"].names:
-
-        #
-        # Prepare data for fit
-        #
-
-        nominal_map = nominal_dataset["mapset"][map_name]
-        nominal_param_values = nominal_dataset["sys_params"]
-
-        sys_maps = [sys_dataset["mapset"][map_name]
-                    for sys_dataset in sys_datasets]
-        sys_param_values = [sys_dataset["sys_params"]
-                            for sys_dataset in sys_datasets]
-
-        #
-        # Fit the hypersurface
-        #
-
-        # Create the hypersurface
-        hypersurface = Hypersurface(
-            params=copy.deepcopy(params),
-            initial_intercept=0. if log else 1.,  # Initial value for intercept
-            log=log
-        )
-
-        # Perform fit
-        hypersurface.fit(
-            nominal_map=nominal_map,
-            nominal_param_values=nominal_param_values,
-            sys_maps=sys_maps,
-            sys_param_values=sys_param_values,
-            norm=True,
-            **hypersurface_fit_kw
-        )
-
-        # Report the results
-        logging.debug("\nFitted hypersurface report:\n%s" % hypersurface)
-
-        # Store for later write to disk
-        hypersurfaces[map_name] = hypersurface
+    hypersurfaces = _fit_mapsets(
+        nominal_mapset=nominal_dataset["mapset"],
+        nominal_param_values=nominal_dataset["sys_params"],
+        sys_mapsets=[sys_dataset["mapset"] for sys_dataset in sys_datasets],
+        sys_param_values=[sys_dataset["sys_params"] for sys_dataset in sys_datasets],
+        params=params,
+        log=log,
+        num_workers=num_workers,
+        hypersurface_fit_kw=hypersurface_fit_kw,
+    )
 
     #
     # Store results
@@ -2192,15 +2757,10 @@ def _load_hypersurfaces_legacy(input_data):
             "fit_params"] if "hyperplanes" in input_data else input_data[map_name]
 
         # Fitted coefficients have following array shape: [ binning dim 0,  ..., binning dim N, sys params (inc. intercept) ]
-        intercept_values = fitted_coefficients[..., 0]
-        sys_param_gradient_values = {
-            n: fitted_coefficients[..., i+1] for i, n in enumerate(param_names)}
-
-        # Write the values to the hypersurface
-        np.copyto(src=intercept_values, dst=hypersurface.intercept)
-        for param in hypersurface.params.values():
-            np.copyto(
-                src=sys_param_gradient_values[param.name], dst=param.fit_coeffts[..., 0])
+        # Write the values to the hypersurface (assigning into the existing arrays)
+        hypersurface.intercept[...] = fitted_coefficients[..., 0]
+        for i, name in enumerate(param_names):
+            hypersurface.params[name].fit_coeffts[..., 0] = fitted_coefficients[..., i+1]
 
         # Done, store the hypersurface
         hypersurfaces[map_name] = hypersurface
@@ -2303,15 +2863,12 @@ def _load_hypersurfaces_data_release(input_file_prototype, binning):
         #
 
         # Intercept
-        intercept_values = offset.values.reshape(binning.shape)
-        np.copyto(src=intercept_values, dst=hypersurface.intercept)
+        hypersurface.intercept[...] = offset.values.reshape(binning.shape)
 
         # Param gradients
         for param in hypersurface.params.values():
-            sys_param_gradient_values = map_fit_results[param.name].values.reshape(
+            param.fit_coeffts[..., 0] = map_fit_results[param.name].values.reshape(
                 binning.shape)
-            np.copyto(src=sys_param_gradient_values,
-                      dst=param.fit_coeffts[..., 0])
 
         # Done, store the hypersurface
         hypersurfaces[map_name] = hypersurface
@@ -2364,13 +2921,19 @@ def plot_bin_fits(ax, hypersurface, bin_idx, param_name, color=None, label=None,
     # Get the param
     param = hypersurface.params[param_name]
 
+    # Get the nominal values of all other params once (scalars are broadcast against
+    # the values of the chosen param when evaluating the hypersurface)
+    other_params_nominal = {name: value for name, value in hypersurface.nominal_values.items()
+                            if name != param.name}
+
     # Check bin index
     assert len(bin_idx) == len(hypersurface.binning.shape)
 
-    # Get bin values for this bin only
+    # Get bin values for this bin only (indexing the bin before extracting the values,
+    # rather than extracting the values of the whole map)
     chosen_bin_values = np.squeeze(
-        [m.nominal_values[bin_idx] for m in hypersurface.fit_maps])
-    chosen_bin_sigma = np.squeeze([m.std_devs[bin_idx]
+        [unp.nominal_values(m.hist[bin_idx]) for m in hypersurface.fit_maps])
+    chosen_bin_sigma = np.squeeze([unp.std_devs(m.hist[bin_idx])
                                    for m in hypersurface.fit_maps])
 
     # Define a mask for selecting on-axis points only
@@ -2394,11 +2957,8 @@ def plot_bin_fits(ax, hypersurface, bin_idx, param_name, color=None, label=None,
         yerr = np.asarray(chosen_bin_sigma)
         prediction = hypersurface.evaluate(
             hypersurface.fit_param_values, bin_idx=bin_idx)
-        params_for_projection = {param.name: x}
-        for p in list(hypersurface.params.values()):
-            if p.name != param.name:
-                params_for_projection[p.name] = np.full_like(
-                    x, hypersurface.nominal_values[p.name])
+        params_for_projection = dict(other_params_nominal)
+        params_for_projection[param.name] = x
         prediction_on_axis = hypersurface.evaluate(
             params_for_projection, bin_idx=bin_idx)
         y_projected = y - prediction + prediction_on_axis
@@ -2413,11 +2973,8 @@ def plot_bin_fits(ax, hypersurface, bin_idx, param_name, color=None, label=None,
     # Then calculate the hypersurface value at each point, using the nominal values for all other sys params
     x_plot = np.linspace(np.nanmin(param.fit_param_values),
                          np.nanmax(param.fit_param_values), num=100)
-    params_for_plot = {param.name: x_plot, }
-    for p in list(hypersurface.params.values()):
-        if p.name != param.name:
-            params_for_plot[p.name] = np.full_like(
-                x_plot, hypersurface.nominal_values[p.name])
+    params_for_plot = dict(other_params_nominal)
+    params_for_plot[param.name] = x_plot
     y_plot, y_sigma = hypersurface.evaluate(
         params_for_plot, bin_idx=bin_idx, return_uncertainty=True)
     ax.plot(x_plot, y_plot, color=("red" if color is None else color))
@@ -2465,10 +3022,11 @@ def plot_bin_fits_2d(ax, hypersurface, bin_idx, param_names):
     assert len(param_names) == 2
     assert len(bin_idx) == len(hypersurface.binning.shape)
 
-    # Get bin values for this bin only
-    chosen_bin_values = [m.nominal_values[bin_idx]
+    # Get bin values for this bin only (indexing the bin before extracting the values,
+    # rather than extracting the values of the whole map)
+    chosen_bin_values = [unp.nominal_values(m.hist[bin_idx])
                          for m in hypersurface.fit_maps]
-    chosen_bin_sigma = [m.std_devs[bin_idx] for m in hypersurface.fit_maps]
+    chosen_bin_sigma = [unp.std_devs(m.hist[bin_idx]) for m in hypersurface.fit_maps]
 
     # Shortcuts to the param values and bin values
     p0 = hypersurface.params[param_names[0]]
@@ -2477,44 +3035,44 @@ def plot_bin_fits_2d(ax, hypersurface, bin_idx, param_names):
     # zerr = #TODO error bars
 
     # Choose categories of points to plot
-    nominal_mask = hypersurface.get_nominal_mask()
-    p0_on_axis_mask = hypersurface.get_on_axis_mask(p0.name) & (~nominal_mask)
-    p1_on_axis_mask = hypersurface.get_on_axis_mask(p1.name) & (~nominal_mask)
-
-    off_axis_mask = np.ones_like(p1_on_axis_mask, dtype=bool)
+    # Get the per-param nominal masks once, and derive all categories from them
+    # Dimensions are: [params, fit sets]
+    param_nominal_masks = hypersurface._get_param_nominal_masks()
+    p0_nominal_mask = param_nominal_masks[hypersurface.param_names.index(p0.name)]
+    p1_nominal_mask = param_nominal_masks[hypersurface.param_names.index(p1.name)]
+    other_params_mask = np.array([name not in param_names for name in hypersurface.param_names])
     # Ignore points that are off-axis for other params
-    for p in list(hypersurface.params.values()):
-        if p.name not in param_names:
-            off_axis_mask = off_axis_mask & (
-                p.fit_param_values == p.nominal_value)
-    off_axis_mask = off_axis_mask & ~(
-        p0_on_axis_mask | p1_on_axis_mask | nominal_mask)
+    others_nominal_mask = np.all(param_nominal_masks[other_params_mask], axis=0)
+
+    # Label each point by whether it is nominal for p0 (bit 0) and p1 (bit 1), so:
+    # 0 = off-axis, 1 = p1 on-axis, 2 = p0 on-axis, 3 = nominal (-1 = not plotted)
+    point_labels = np.where(others_nominal_mask,
+                            p0_nominal_mask.astype(np.int8) + 2 * p1_nominal_mask, -1)
 
     # Plot data points
-    ax.scatter(p0.fit_param_values[p0_on_axis_mask], p1.fit_param_values[p0_on_axis_mask],
-               z[p0_on_axis_mask], marker="o", color="blue", label="%s on-axis" % p0.name)
-    ax.scatter(p0.fit_param_values[p1_on_axis_mask], p1.fit_param_values[p1_on_axis_mask],
-               z[p1_on_axis_mask], marker="^", color="red", label="%s on-axis" % p1.name)
-    ax.scatter(p0.fit_param_values[off_axis_mask], p1.fit_param_values[off_axis_mask],
-               z[off_axis_mask], marker="s", color="black", label="Off-axis")
-    ax.scatter(p0.fit_param_values[nominal_mask], p1.fit_param_values[nominal_mask],
-               z[nominal_mask], marker="*", color="magenta", label="Nominal")
+    for point_label, marker, color, label in [
+            (2, "o", "blue", "%s on-axis" % p0.name),
+            (1, "^", "red", "%s on-axis" % p1.name),
+            (0, "s", "black", "Off-axis"),
+            (3, "*", "magenta", "Nominal"),
+    ]:
+        mask = point_labels == point_label
+        ax.scatter(p0.fit_param_values[mask], p1.fit_param_values[mask],
+                   z[mask], marker=marker, color=color, label=label)
 
     # Plot hypersurface (as a 2D surface)
     x_plot = np.linspace(p0.fit_param_values.min(),
                          p0.fit_param_values.max(), num=100)
     y_plot = np.linspace(p1.fit_param_values.min(),
                          p1.fit_param_values.max(), num=100)
-    x_grid, y_grid = np.meshgrid(x_plot, y_plot)
-    x_grid_flat = x_grid.flatten()
-    y_grid_flat = y_grid.flatten()
-    params_for_plot = {p0.name: x_grid_flat, p1.name: y_grid_flat, }
-    for p in list(hypersurface.params.values()):
-        if p.name not in list(params_for_plot.keys()):
-            params_for_plot[p.name] = np.full_like(
-                x_grid_flat, hypersurface.nominal_values[p.name])
-    z_grid_flat = hypersurface.evaluate(params_for_plot, bin_idx=bin_idx)
-    z_grid = z_grid_flat.reshape(x_grid.shape)
+    x_grid, y_grid = np.meshgrid(x_plot, y_plot, sparse=True)
+    # All other params are held at their nominal values (scalars are broadcast)
+    params_for_plot = {name: value for name, value in hypersurface.nominal_values.items()
+                       if name not in param_names}
+    params_for_plot[p0.name] = x_grid
+    params_for_plot[p1.name] = y_grid
+    z_grid = hypersurface.evaluate(params_for_plot, bin_idx=bin_idx)
+    x_grid, y_grid = np.broadcast_arrays(x_grid, y_grid)
     surf = ax.plot_surface(x_grid, y_grid, z_grid, cmap="viridis", linewidth=0,
                            antialiased=False, alpha=0.2)  # , label="Hypersurface" )
 
@@ -2542,15 +3100,11 @@ def generate_asimov_testdata(binning, parameters, true_param_coeffs,
 
     hypersurface._init(binning=binning, nominal_param_values=nominal_param_values)
     from pisa.core.map import Map, MapSet
-    for bin_idx in np.ndindex(binning.shape):
-        for name, coeffs in true_param_coeffs.items():
-            assert len(coeffs) == hypersurface.params[name].num_fit_coeffts, ("number "
-                                                                              "of coefficients in the parameter must match")
-            for j, c in enumerate(coeffs):
-                idx = hypersurface.params[name].get_fit_coefft_idx(bin_idx=bin_idx,
-                                                                   coefft_idx=j,
-                                                                   )
-                hypersurface.params[name].fit_coeffts[idx] = c
+    for name, coeffs in true_param_coeffs.items():
+        assert len(coeffs) == hypersurface.params[name].num_fit_coeffts, ("number "
+                                                                          "of coefficients in the parameter must match")
+        for j, c in enumerate(coeffs):
+            hypersurface.params[name].fit_coeffts[..., j] = c
     logging.debug("Truth hypersurface report:\n%s" % str(hypersurface))
 
     # Only consider one particle type for simplicity
@@ -2774,7 +3328,7 @@ def test_hypersurface_basics():
 
     # Create a dummy "true" hypersurface that can be used to generate
     # some fake bin values for the dataset
-    true_hypersurface = copy.deepcopy(hypersurface)
+    true_hypersurface = hypersurface.clone()
     true_hypersurface._init(
         binning=binning, nominal_param_values=nom_param_values)
     true_hypersurface.intercept.fill(10.)
@@ -2791,13 +3345,17 @@ def test_hypersurface_basics():
     nom_map = Map(name=particle_key, binning=binning,
                   hist=hist, error_hist=np.sqrt(hist),
                   )
+    # Evaluate all datasets at once, e.g. passing arrays of param values
+    # Dimensions are: [datasets, binning ...]
+    sys_hists = true_hypersurface.evaluate({name: np.asarray(sys_param_values_dict[name])
+                                            for name in list(true_hypersurface.params.keys())})
     sys_maps = []
     sys_param_values = []
     for i in range(num_sys_datasets):
         sys_param_values.append({name: sys_param_values_dict[name][i]
                                  for name in list(true_hypersurface.params.keys())
                                  })
-        hist = true_hypersurface.evaluate(sys_param_values[-1])
+        hist = sys_hists[i]
         sys_maps.append(Map(name=particle_key, binning=binning,
                             hist=hist, error_hist=np.sqrt(hist),
                             )
@@ -2858,11 +3416,201 @@ def test_hypersurface_basics():
                            reloaded_hypersurface.params[param_name].fit_coeffts,
                            rtol=ALLCLOSE_KW['rtol']*10.)
     logging.debug("... setting and getting coefficients was successful!")
+
+    # test that the compiled kernels used when evaluating all bins at once agree with
+    # the numpy forms used when fitting
+    logging.debug("Checking accumulate kernels agree with the functional forms...")
+    rng = np.random.RandomState(0)
+    for func_name, func_class in HYPERSURFACE_PARAM_FUNCTIONS.items():
+        func = func_class()
+        coeffts = [rng.uniform(-0.5, 0.5, size=(7, 3)) for _ in range(func.nargs)]
+        for p in [1e-9, 0.3, -1.5, 1.5]:
+            expected = np.empty_like(coeffts[0])
+            func(p, *coeffts, out=expected)
+            accumulated = np.zeros_like(coeffts[0])
+            func.accumulate(p, *coeffts, out=accumulated)
+            assert np.allclose(accumulated, expected, rtol=1e-14, atol=0.), func_name
+    logging.debug("... kernels agree!")
     logging.info('<< PASS : test_hypersurface_basics >>')
 
 
+def test_hypersurface_fast_fit():
+    '''
+    Test that the batched fit of hypersurfaces agrees with the bin-by-bin minimizer
+    fit, both for the closed form case (functional forms linear in their coefficients)
+    and the iterative case (non-linear functional forms, log mode)
+    '''
+
+    binning = MultiDimBinning([OneDimBinning(name="reco_energy",
+                                             domain=[0., 10.],
+                                             num_bins=4,
+                                             units=ureg.GeV,
+                                             is_lin=True
+                                             )])
+
+    nominal_param_values = {'foo': 1., 'bar': 0.}
+    sys_param_values = [{'foo': f, 'bar': b}
+                        for f in np.linspace(-2., 2., 4) for b in np.linspace(-2, 1.5, 5)]
+
+    test_cases = [
+        # Linear in coefficients -> closed form solution
+        dict(
+            params=[
+                HypersurfaceParam(name="foo", func_name="linear",
+                                  initial_fit_coeffts=[1.]),
+                HypersurfaceParam(name="bar", func_name="quadratic",
+                                  initial_fit_coeffts=[1., -1.], coeff_prior_sigma=[10., 1.]),
+            ],
+            true_coeffs={'foo': [-0.4], 'bar': [0.5, 1.]},
+            log=False,
+        ),
+        # Non-linear -> iterative solution
+        dict(
+            params=[
+                HypersurfaceParam(name="foo", func_name="exponential",
+                                  initial_fit_coeffts=[0.]),
+                HypersurfaceParam(name="bar", func_name="linear",
+                                  initial_fit_coeffts=[0.]),
+            ],
+            true_coeffs={'foo': [-0.2], 'bar': [0.1]},
+            log=True,
+        ),
+    ]
+
+    for test_case in test_cases:
+
+        params = test_case["params"]
+
+        nom_map, sys_maps = generate_asimov_testdata(binning,
+                                                     params,
+                                                     test_case["true_coeffs"],
+                                                     nominal_param_values,
+                                                     sys_param_values,
+                                                     intercept=5.,
+                                                     log=test_case["log"],
+                                                     error_scale=0.2,
+                                                     )
+        # Fluctuate the maps such that the fit is not exact
+        nom_map = nom_map.fluctuate(method='gauss', random_state=0)
+        sys_maps = [m.fluctuate(method='gauss', random_state=i+1)
+                    for i, m in enumerate(sys_maps)]
+
+        hypersurfaces = {}
+        for fast in [False, True]:
+            hypersurface = Hypersurface(params=copy.deepcopy(params), initial_intercept=1.,
+                                        log=test_case["log"])
+            hypersurface.fit(
+                nominal_map=nom_map,
+                nominal_param_values=nominal_param_values,
+                sys_maps=sys_maps,
+                sys_param_values=sys_param_values,
+                norm=False,
+                fast=fast,
+            )
+            hypersurfaces[fast] = hypersurface
+
+        # Agree within the precision of the minimizer
+        assert np.allclose(hypersurfaces[True].fit_coeffts, hypersurfaces[False].fit_coeffts,
+                           rtol=1e-3, atol=1e-4)
+        assert np.allclose(hypersurfaces[True].fit_cov_mat, hypersurfaces[False].fit_cov_mat,
+                           rtol=2e-2, atol=1e-6)
+        assert np.allclose(np.sum(hypersurfaces[True].fit_chi2, axis=-1),
+                           np.sum(hypersurfaces[False].fit_chi2, axis=-1),
+                           rtol=1e-3)
+
+    logging.info('<< PASS : test_hypersurface_fast_fit >>')
+
+
+def test_hypersurface_parallel_fit():
+    '''
+    Test that fitting the bins (`Hypersurface.fit`) or the maps (as done by
+    `fit_hypersurfaces`) in parallel processes gives the same results as the serial fit
+    '''
+
+    from pisa.core.map import MapSet
+
+    binning = MultiDimBinning([OneDimBinning(name="reco_energy",
+                                             domain=[0., 10.],
+                                             num_bins=4,
+                                             units=ureg.GeV,
+                                             is_lin=True
+                                             )])
+
+    nominal_param_values = {'foo': 1., 'bar': 0.}
+    sys_param_values = [{'foo': f, 'bar': b}
+                        for f in np.linspace(-2., 2., 4) for b in np.linspace(-2, 1.5, 5)]
+
+    params = [
+        HypersurfaceParam(name="foo", func_name="exponential", initial_fit_coeffts=[0.]),
+        HypersurfaceParam(name="bar", func_name="linear", initial_fit_coeffts=[0.]),
+    ]
+
+    nom_map, sys_maps = generate_asimov_testdata(binning,
+                                                 params,
+                                                 {'foo': [-0.2], 'bar': [0.1]},
+                                                 nominal_param_values,
+                                                 sys_param_values,
+                                                 intercept=5.,
+                                                 log=True,
+                                                 error_scale=0.2,
+                                                 )
+    nom_map = nom_map.fluctuate(method='gauss', random_state=0)
+    sys_maps = [m.fluctuate(method='gauss', random_state=i+1)
+                for i, m in enumerate(sys_maps)]
+
+    def assert_same_fit(hs_a, hs_b):
+        assert np.allclose(hs_a.intercept, hs_b.intercept, rtol=1e-12, atol=0.)
+        assert np.allclose(hs_a.fit_coeffts, hs_b.fit_coeffts, rtol=1e-12, atol=0.)
+        assert np.allclose(hs_a.fit_cov_mat, hs_b.fit_cov_mat, rtol=1e-12, atol=0.)
+        assert np.allclose(hs_a.fit_chi2, hs_b.fit_chi2, rtol=1e-12, atol=0.)
+
+    # Bins fitted with the minimizer in parallel processes
+    hypersurfaces = {}
+    for num_bin_workers in [1, 2]:
+        hypersurface = Hypersurface(params=[p.clone() for p in params],
+                                    initial_intercept=0., log=True)
+        hypersurface.fit(
+            nominal_map=nom_map,
+            nominal_param_values=nominal_param_values,
+            sys_maps=sys_maps,
+            sys_param_values=sys_param_values,
+            norm=False,
+            num_bin_workers=num_bin_workers,
+        )
+        hypersurfaces[num_bin_workers] = hypersurface
+    assert_same_fit(hypersurfaces[1], hypersurfaces[2])
+
+    # Maps fitted in parallel processes
+    def to_mapset(m):
+        other = m * 2.
+        other.name = 'other'
+        return MapSet([m, other])
+
+    nominal_mapset = to_mapset(nom_map)
+    sys_mapsets = [to_mapset(m) for m in sys_maps]
+    fitted = {}
+    for num_workers in [1, 2]:
+        fitted[num_workers] = _fit_mapsets(
+            nominal_mapset=nominal_mapset,
+            nominal_param_values=nominal_param_values,
+            sys_mapsets=sys_mapsets,
+            sys_param_values=sys_param_values,
+            params=params,
+            log=True,
+            num_workers=num_workers,
+            hypersurface_fit_kw={},
+        )
+    assert list(fitted[1].keys()) == list(fitted[2].keys()) == nominal_mapset.names
+    for map_name in nominal_mapset.names:
+        assert_same_fit(fitted[1][map_name], fitted[2][map_name])
+
+    logging.info('<< PASS : test_hypersurface_parallel_fit >>')
+
+
 # Run the examp'es/tests
 if __name__ == "__main__":
     set_verbosity(2)
     test_hypersurface_basics()
     test_hypersurface_uncertainty()
+    test_hypersurface_fast_fit()
+    test_hypersurface_parallel_fit()
@@ -13,7 +13,8 @@ import copy
 from pisa.core.binning import OneDimBinning, MultiDimBinning
 
 
-__all__ = ['get_hist', 'kde_histogramdd', 'test_kde_histogramdd']
+__all__ = ['fold_reflection_edges', 'get_hist', 'kde_histogramdd',
+           'test_fold_reflection_edges', 'test_kde_histogramdd']
 
 __author__ = 'P. Eller'
 
@@ -32,6 +33,24 @@ __license__ = '''Copyright (c) 2014-2017, The IceCube Collaboration
  limitations under the License.'''
 
 
+def fold_reflection_edges(hist, num_bins, l, reflect_lower, reflect_upper):
+    """Mirror the `l` reflection rows at either end of `hist` (along axis 0)
+    and add them onto the outermost of the `num_bins` kept rows.
+
+    The addition is done in place on the kept rows, which are returned as a
+    view into `hist` (the edges do not overlap the kept region).
+    """
+    start = l if reflect_lower else 0
+    stop = start + num_bins
+    kept_hist = hist[start:stop]
+    # Slice the edges explicitly so that `l == 0` yields empty edges
+    if reflect_lower:
+        kept_hist[:l] += hist[:start][::-1]
+    if reflect_upper:
+        kept_hist[num_bins-l:] += hist[stop:stop+l][::-1]
+    return kept_hist
+
+
 def get_hist(sample, binning, weights=None, bw_method='scott', adaptive=True,
              alpha=0.3, use_cuda=False, coszen_reflection=0.25,
              coszen_name='coszen', oversample=1):
@@ -121,12 +140,13 @@ def get_hist(sample, binning, weights=None, bw_method='scott', adaptive=True,
         binning.shape[1]
     )
 
-    # Shape of the reflection edges alone
-    minishape = (binning.shape[0] - l, binning.shape[1])
-
-    # Create a set of points
-    grid = np.meshgrid(*bin_points, indexing='ij')
-    points = np.array([g.ravel() for g in grid])
+    # Create a set of points, filling each row of the (dims, points) array by
+    # broadcasting the bin points directly (no intermediate meshgrid copies)
+    grid_shape = tuple(len(c) for c in bin_points)
+    points = np.empty((len(bin_points),) + grid_shape)
+    for i, c in enumerate(bin_points):
+        points[i] = np.reshape(c, (-1,) + (1,)*(len(bin_points)-1-i))
+    points = points.reshape(len(bin_points), -1)
 
     # Evaluate KDEs at given points
     hist = kernel_weights_adaptive(points)
@@ -134,44 +154,35 @@ def get_hist(sample, binning, weights=None, bw_method='scott', adaptive=True,
     # Reshape 1d array into nd
     hist = hist.reshape(megashape)
 
-    # Cut off the reflection edges, mirror them, fill up remaining space with
-    # zeros and add to histo
-    if reflect_lower:
-        hist0 = hist[0:l, :]
-        hist0_0 = np.zeros(minishape)
-        hist0 = np.flipud(np.concatenate([hist0_0, hist0]))
-        hist = hist[l:, :]
-    else:
-        hist0 = 0
-
-    if reflect_upper:
-        hist1 = hist[-l:, :]
-        hist1_0 = np.zeros(minishape)
-        hist1 = np.flipud(np.concatenate([hist1, hist1_0]))
-        hist = hist[:-l, :]
-    else:
-        hist1 = 0
-
-    hist = hist + hist1 + hist0
+    # Cut off the reflection edges, mirror them and add them onto the outermost
+    # bins of the histo
+    reflected_hist = fold_reflection_edges(
+        hist, num_bins=binning.shape[0], l=l, reflect_lower=reflect_lower,
+        reflect_upper=reflect_upper
+    )
 
     # Bin volumes
     volume = binning.bin_volumes(attach_units=False)
-    hist = hist*volume
+    hist = reflected_hist*volume
 
-    # Downsample
+    # Downsample: every dimension has been oversampled by the same factor, so
+    # split each axis into (bins, oversample) and sum over all the sub-bin axes
+    # in one reduction
     if oversample != 1:
-        for i, b in enumerate(binning):
-            hist = np.add.reduceat(
-                hist,
-                np.arange(0, len(b.bin_edges)-1, oversample),
-                axis=i
-            )
+        split_shape = []
+        for num_bins in hist.shape:
+            split_shape += [num_bins // oversample, oversample]
+        hist = hist.reshape(split_shape).sum(
+            axis=tuple(range(1, 2*hist.ndim, 2))
+        )
 
     # Swap back the axes
     if cz_bin != 0:
         hist = np.swapaxes(hist, 0, cz_bin)
 
-    return hist*norm
+    # Apply the overall normalization in place, on the (downsampled) final histo
+    hist *= norm
+    return hist
 
 def kde_histogramdd(sample, binning, weights=None, bw_method='scott',
                     adaptive=True, alpha=0.3, use_cuda=False,
@@ -268,16 +279,16 @@ def kde_histogramdd(sample, binning, weights=None, bw_method='scott',
         if b.name != 'pid':
             d2d_binning.append(b)
     d2d_binning = MultiDimBinning(d2d_binning)
+    # Assign every event to its pid bin once (events outside the pid edges get
+    # an index that matches none of the bins), and pick out the other two
+    # dimensions in one go, as a contiguous (dims, events) array so that each
+    # pid selection below is a contiguous copy too
+    pid_idx = np.digitize(sample[:, pid_bin], pid_bin_edges) - 1
+    other_sample = sample.T[other_bins]
     pid_stack = []
     for pid in range(len(pid_bin_edges)-1):
-        mask_pid = (
-            (sample.T[pid_bin] >= pid_bin_edges[pid])
-            & (sample.T[pid_bin] < pid_bin_edges[pid+1])
-        )
-        data = np.array([
-            sample.T[other_bins[0]][mask_pid],
-            sample.T[other_bins[1]][mask_pid]
-        ])
+        mask_pid = pid_idx == pid
+        data = np.compress(mask_pid, other_sample, axis=1)
 
         if weights is None:
             weights_pid = None
@@ -304,6 +315,41 @@ def kde_histogramdd(sample, binning, weights=None, bw_method='scott',
     return hist
 
 
+def test_fold_reflection_edges():
+    """Unit tests for fold_reflection_edges, checked against mirroring the
+    edges via zero-padded, flipped copies"""
+    rng = np.random.RandomState(0)
+    num_bins = 6
+    for l in range(4):
+        for reflect_lower in (False, True):
+            for reflect_upper in (False, True):
+                megashape = (num_bins + (reflect_lower+reflect_upper)*l, 5)
+                hist = rng.uniform(size=megashape)
+
+                # Reference: concatenate zeros, flip and sum
+                ref = hist.copy()
+                minishape = (num_bins - l, megashape[1])
+                hist0 = hist1 = 0
+                if reflect_lower:
+                    hist0 = np.flipud(np.concatenate(
+                        [np.zeros(minishape), ref[0:l, :]]
+                    ))
+                    ref = ref[l:, :]
+                if reflect_upper and l > 0:
+                    hist1 = np.flipud(np.concatenate(
+                        [ref[-l:, :], np.zeros(minishape)]
+                    ))
+                    ref = ref[:-l, :]
+                ref = ref + hist1 + hist0
+
+                folded = fold_reflection_edges(
+                    hist, num_bins=num_bins, l=l, reflect_lower=reflect_lower,
+                    reflect_upper=reflect_upper
+                )
+                assert folded.shape == (num_bins, megashape[1])
+                assert np.allclose(folded, ref, rtol=0, atol=1e-14)
+
+
 # TODO: make the plotting optional but add comparisons against some known
 # results. This can be accomplished by seeding before calling random to obtain
 # a reference result, and check that the same values are returned when run
@@ -371,6 +417,19 @@ def test_kde_histogramdd():
         m4.tex = m4.name
         ms = MapSet([m1, m2, m3, m4])
         my_plotter.plot_2d_array(ms, fname='test_kde', cmap='summer')
+
+        # Only the lower coszen edge reflected, with too few bins for any
+        # reflection rows (l == 0)
+        b1_lower = OneDimBinning(name='coszen', num_bins=2, is_lin=True,
+                                 domain=[-1, 0], tex=r'\cos(\theta)')
+        binning_lower = b1_lower * b2 * b3
+        lower_data = data[data[:, 0] <= 0]
+        hist_lower = kde_histogramdd(lower_data, binning_lower,
+                                     bw_method='silverman',
+                                     coszen_name='coszen', use_cuda=False,
+                                     stack_pid=True)
+        assert hist_lower.shape == binning_lower.shape
+        assert np.all(np.isfinite(hist_lower))
     except:
         rmtree(temp_dir)
         raise
@@ -381,4 +440,5 @@ def test_kde_histogramdd():
 
 
 if __name__ == '__main__':
+    test_fold_reflection_edges()
     test_kde_histogramdd()
@@ -75,7 +75,7 @@ class Spline(object):
             tex = flavInt.NuFlavIntGroup(name).tex
 
         # Ensure eval_spl has correct structure
-        eval_args = inspect.getargspec(eval_spl).args
+        eval_args = inspect.getfullargspec(eval_spl).args
         if len(eval_args) < 2:
             raise ValueError('Evaluation function does not contain the '
                              'minimum number of input parameters (2)\n'
@@ -92,7 +92,7 @@ class Spline(object):
         self._eval_spl = eval_spl
 
         # Ensure validate_spl has correct structure
-        validate_args = inspect.getargspec(validate_spl).args
+        validate_args = inspect.getfullargspec(validate_spl).args
         if len(validate_args) != 1:
             raise ValueError('Binning validation function contains more than '
                              'the maximum number of input parameters (1)\n'
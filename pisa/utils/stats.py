@@ -5,6 +5,8 @@ Statistical functions
 
 from __future__ import absolute_import, division
 
+from operator import attrgetter
+
 import numpy as np
 from scipy.special import gammaln
 from uncertainties import unumpy as unp
@@ -95,6 +97,39 @@ def maperror_logmsg(m):
     return msg
 
 
+_get_nominal_value = np.frompyfunc(attrgetter('nominal_value'), 1, 1)
+_get_std_dev = np.frompyfunc(attrgetter('std_dev'), 1, 1)
+
+
+def _nominal_values(values):
+    """Nominal values of `values` as a new float array, like
+    `unumpy.nominal_values` but without its element-by-element conversion for
+    arrays that do not contain uncertainties (and with a faster one for arrays
+    that only contain them)"""
+    if isbarenumeric(values):
+        return np.array(values, dtype=np.float64)
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        try:
+            return _get_nominal_value(values).astype(np.float64)
+        except AttributeError:
+            # Mixed contents (e.g. plain floats), or a single (0-d) element
+            pass
+    return unp.nominal_values(values)
+
+
+def _std_devs(values):
+    """Standard deviations of `values` as a new float array, like
+    `unumpy.std_devs` (see `_nominal_values`)"""
+    if isbarenumeric(values):
+        return np.zeros(np.shape(values))
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        try:
+            return _get_std_dev(values).astype(np.float64)
+        except AttributeError:
+            pass
+    return unp.std_devs(values)
+
+
 def chi2(actual_values, expected_values):
     """Compute the chi-square between each value in `actual_values` and
     `expected_values`.
@@ -124,43 +159,49 @@ def chi2(actual_values, expected_values):
 
     # Convert to simple numpy arrays containing floats
     if not isbarenumeric(actual_values):
-        actual_values = unp.nominal_values(actual_values)
+        actual_values = _nominal_values(actual_values)
     if not isbarenumeric(expected_values):
-        expected_values = unp.nominal_values(expected_values)
+        expected_values = _nominal_values(expected_values)
 
-    with np.errstate(invalid='ignore'):
-        # Mask off any nan expected values (these are assumed to be ok)
-        actual_values = np.ma.masked_invalid(actual_values)
-        expected_values = np.ma.masked_invalid(expected_values)
+    # Work on plain arrays and build the mask of the returned masked array
+    # explicitly (masked array arithmetic is slow); masked are any nan/inf
+    # inputs (these are assumed to be ok)
+    invalid = ~np.isfinite(actual_values) | ~np.isfinite(expected_values)
+    valid = ~invalid
 
+    with np.errstate(invalid='ignore'):
         # TODO: this check (and the same for `actual_values`) should probably
         # be done elsewhere... maybe?
-        if np.any(actual_values < 0):
+        if np.any((actual_values < 0) & np.isfinite(actual_values)):
             msg = ('`actual_values` must all be >= 0...\n'
-                   + maperror_logmsg(actual_values))
+                   + maperror_logmsg(np.ma.masked_invalid(actual_values)))
             raise ValueError(msg)
 
-        if np.any(expected_values < 0):
+        if np.any((expected_values < 0) & np.isfinite(expected_values)):
             msg = ('`expected_values` must all be >= 0...\n'
-                   + maperror_logmsg(expected_values))
+                   + maperror_logmsg(np.ma.masked_invalid(expected_values)))
             raise ValueError(msg)
 
         # TODO: Is this okay to do? Mathematically suspect at best, and can
         #       still destroy a minimizer's hopes and dreams...
 
         # Replace 0's with small positive numbers to avoid inf in division
-        np.clip(expected_values, a_min=SMALL_POS, a_max=np.inf,
-                out=expected_values)
-
+        expected_values = np.clip(expected_values, a_min=SMALL_POS,
+                                  a_max=np.inf)
 
         delta = actual_values - expected_values
 
-    if np.all(np.abs(delta) < 5*FTYPE_PREC):
-        return np.zeros_like(delta, dtype=FTYPE)
+        # (only the small boolean array is masked here, so that all-masked inputs
+        # behave as before, i.e. don't count as "identical")
+        if np.ma.masked_array(np.abs(delta) < 5*FTYPE_PREC, mask=invalid).all():
+            return np.ma.masked_array(np.zeros(delta.shape, dtype=FTYPE),
+                                      mask=invalid)
 
-    chi2_val = np.square(delta) / expected_values
-    assert np.all(chi2_val >= 0), str(chi2_val[chi2_val < 0])
-    return chi2_val
+        chi2_val = np.square(delta)
+        chi2_val /= expected_values
+
+    assert np.all(chi2_val[valid] >= 0), str(chi2_val[valid][chi2_val[valid] < 0])
+    return np.ma.masked_array(chi2_val, mask=invalid)
 
 
 def llh(actual_values, expected_values):
@@ -188,44 +229,47 @@ def llh(actual_values, expected_values):
 
     # Convert to simple numpy arrays containing floats
     if not isbarenumeric(actual_values):
-        actual_values = unp.nominal_values(actual_values)
+        actual_values = _nominal_values(actual_values)
     if not isbarenumeric(expected_values):
-        expected_values = unp.nominal_values(expected_values)
-
-    with np.errstate(invalid='ignore'):
-        # Mask off any nan expected values (these are assumed to be ok)
-        actual_values = np.ma.masked_invalid(actual_values)
-        expected_values = np.ma.masked_invalid(expected_values)
+        expected_values = _nominal_values(expected_values)
 
+    # Work on plain arrays and build the mask of the returned masked array
+    # explicitly (masked array arithmetic is slow); masked are any nan/inf
+    # inputs, as well as bins with zero actual counts (where log is undefined)
+    invalid_actual = ~np.isfinite(actual_values)
+    invalid_expected = ~np.isfinite(expected_values)
 
-        # TODO: How should we handle nan / masked values in the "data"
-        # (actual_values) distribution? How about negative numbers?
+    # TODO: How should we handle nan / masked values in the "data"
+    # (actual_values) distribution? How about negative numbers?
 
-        # Make sure actual values (aka "data") are valid -- no infs, no nans,
-        # etc.
-        if np.any((actual_values < 0) | ~np.isfinite(actual_values)):
+    # Make sure actual values (aka "data") are valid -- no infs, no nans,
+    # etc.
+    with np.errstate(invalid='ignore'):
+        if np.any((actual_values < 0) & ~invalid_actual):
             msg = ('`actual_values` must be >= 0 and neither inf nor nan...\n'
-                   + maperror_logmsg(actual_values))
+                   + maperror_logmsg(np.ma.masked_invalid(actual_values)))
             raise ValueError(msg)
 
         # Check that new array contains all valid entries
-        if np.any(expected_values < 0.0):
+        if np.any((expected_values < 0.0) & ~invalid_expected):
             msg = ('`expected_values` must all be >= 0...\n'
-                   + maperror_logmsg(expected_values))
+                   + maperror_logmsg(np.ma.masked_invalid(expected_values)))
             raise ValueError(msg)
 
-        # Replace 0's with small positive numbers to avoid inf in log
-        np.clip(expected_values, a_min=SMALL_POS, a_max=np.inf,
-                out=expected_values)
+    # Replace 0's with small positive numbers to avoid inf in log
+    expected_values = np.clip(expected_values, a_min=SMALL_POS, a_max=np.inf)
 
     #
     # natural logarith m of the Poisson probability
     # (uses Stirling's approximation to estimate ln(k!) ~ kln(k)-k)
     #
-    llh_val = actual_values*np.log(expected_values) - expected_values
-    llh_val -= actual_values*np.log(actual_values) - actual_values
+    with np.errstate(divide='ignore', invalid='ignore'):
+        llh_val = actual_values*np.log(expected_values) - expected_values
+        llh_val -= actual_values*np.log(actual_values) - actual_values
 
-    return llh_val
+    return np.ma.masked_array(
+        llh_val, mask=invalid_actual | invalid_expected | (actual_values == 0)
+    )
 
 def mcllh_mean(actual_values, expected_values):
     """Compute the log-likelihood (llh) based on LMean in table 2 - https://doi.org/10.1007/JHEP06(2019)030
@@ -249,14 +293,17 @@ def mcllh_mean(actual_values, expected_values):
     assert actual_values.shape == expected_values.shape
 
     # Convert to simple numpy arrays containing floats
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigma = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
+    sigma = _std_devs(expected_values).ravel()
+    expected_values = _nominal_values(expected_values).ravel()
 
     with np.errstate(invalid='ignore'):
-        # Mask off any nan expected values (these are assumed to be ok)
-        actual_values = np.ma.masked_invalid(actual_values)
-        expected_values = np.ma.masked_invalid(expected_values)
+        # Mask off any nan expected values (these are assumed to be ok), if
+        # there are any (masked arrays are slow)
+        if not (np.all(np.isfinite(actual_values))
+                and np.all(np.isfinite(expected_values))):
+            actual_values = np.ma.masked_invalid(actual_values)
+            expected_values = np.ma.masked_invalid(expected_values)
 
 
         # TODO: How should we handle nan / masked values in the "data"
@@ -308,14 +355,17 @@ def mcllh_eff(actual_values, expected_values):
     assert actual_values.shape == expected_values.shape
 
     # Convert to simple numpy arrays containing floats
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigma = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
+    sigma = _std_devs(expected_values).ravel()
+    expected_values = _nominal_values(expected_values).ravel()
 
     with np.errstate(invalid='ignore'):
-        # Mask off any nan expected values (these are assumed to be ok)
-        actual_values = np.ma.masked_invalid(actual_values)
-        expected_values = np.ma.masked_invalid(expected_values)
+        # Mask off any nan expected values (these are assumed to be ok), if
+        # there are any (masked arrays are slow)
+        if not (np.all(np.isfinite(actual_values))
+                and np.all(np.isfinite(expected_values))):
+            actual_values = np.ma.masked_invalid(actual_values)
+            expected_values = np.ma.masked_invalid(expected_values)
 
 
         # TODO: How should we handle nan / masked values in the "data"
@@ -345,7 +395,7 @@ def mcllh_eff(actual_values, expected_values):
 
 
 
-def log_poisson(k, l):
+def log_poisson(k, l, log_k_factorial=None):
     r"""Calculate the log of a poisson pdf
 
     .. math::
@@ -355,6 +405,9 @@ def log_poisson(k, l):
     ----------
     k : float
     l : float
+    log_k_factorial : None or float
+        Precomputed `gammaln(k+1)`, e.g. when evaluating many `l` for the same
+        `k`; computed from `k` if None
 
     Returns
     -------
@@ -362,7 +415,9 @@ def log_poisson(k, l):
     log of poisson
 
     """
-    return k*np.log(l) -l - gammaln(k+1)
+    if log_k_factorial is None:
+        log_k_factorial = gammaln(k+1)
+    return k*np.log(l) -l - log_k_factorial
 
 
 def log_smear(x, sigma):
@@ -411,28 +466,53 @@ def conv_poisson(k, l, s, nsigma=3, steps=50):
         convoluted poissson likelihood
 
     """
-    # Replace 0's with small positive numbers to avoid inf in log
-    l = max(SMALL_POS, l)
+    s = np.atleast_1d(s)
+    return _conv_poisson(
+        np.atleast_1d(k), np.atleast_1d(l), s,
+        _smear_grid(s, nsigma=nsigma, steps=steps)
+    )[0]
+
+
+def _smear_grid(s, nsigma, steps):
+    """Integration grid, log of the gaussian smearing term on it and the
+    normalization of the latter, for each element of the 1d array `s` (these
+    only depend on `s`, so can be shared between convolutions)"""
     st = 2*(steps + 1)
-    conv_x = np.linspace(-nsigma*s, +nsigma*s, st)[:-1]+nsigma*s/(st-1.)
-    conv_y = log_smear(conv_x, s)
-    f_x = conv_x + l
-    #f_x = conv_x + k
-    # Avoid zero values for lambda
-    idx = np.argmax(f_x > 0)
-    f_y = log_poisson(k, f_x[idx:])
-    #f_y = log_poisson(f_x[idx:], l)
-    if np.isnan(f_y).any():
+    conv_x = (
+        (np.linspace(-nsigma, +nsigma, st)[:-1] + nsigma/(st-1.))
+        * s[:, np.newaxis]
+    )
+    conv_y = log_smear(conv_x, s[:, np.newaxis])
+    norm = np.sum(np.exp(conv_y), axis=1)
+    return conv_x, conv_y, norm
+
+
+def _conv_poisson(k, l, s, smear_grid):
+    """Array version of `conv_poisson`, evaluating the convolution for each
+    element of the 1d arrays `k`, `l` and `s` at once (the integration grid
+    from `_smear_grid` is a second, broadcast dimension)"""
+    conv_x, conv_y, norm = smear_grid
+    # Replace 0's with small positive numbers to avoid inf in log
+    l = np.fmax(SMALL_POS, l)
+    f_x = conv_x + l[:, np.newaxis]
+    # Avoid zero values for lambda (`f_x` increases along the grid, so this
+    # keeps everything from the first positive value on)
+    positive = f_x > 0
+    # (the factorial term only depends on `k`, so evaluate it once per element
+    # rather than at every grid point)
+    f_y = log_poisson(k[:, np.newaxis], np.where(positive, f_x, 1.),
+                      log_k_factorial=gammaln(k+1)[:, np.newaxis])
+    nan_mask = np.isnan(f_y) & positive
+    if nan_mask.any():
+        nan_rows = np.flatnonzero(nan_mask.any(axis=1))
         logging.error('`NaN values`:')
-        logging.error('idx = %d', idx)
-        logging.error('s = %s', s)
-        logging.error('l = %s', l)
-        logging.error('f_x = %s', f_x)
-        logging.error('f_y = %s', f_y)
+        logging.error('k = %s', k[nan_rows])
+        logging.error('s = %s', s[nan_rows])
+        logging.error('l = %s', l[nan_rows])
     f_y = np.nan_to_num(f_y)
-    conv = np.exp(conv_y[idx:] + f_y)
-    norm = np.sum(np.exp(conv_y))
-    return conv.sum()/norm
+    conv = np.sum(np.exp(conv_y + f_y, where=positive, out=np.zeros_like(f_y)),
+                  axis=1)
+    return conv/norm
 
 
 def norm_conv_poisson(k, l, s, nsigma=3, steps=50):
@@ -459,9 +539,19 @@ def norm_conv_poisson(k, l, s, nsigma=3, steps=50):
         (asimov) does not change
 
     """
-    cp = conv_poisson(k, l, s, nsigma=nsigma, steps=steps)
+    s = np.atleast_1d(s)
+    return _norm_conv_poisson(
+        np.atleast_1d(k), np.atleast_1d(l), s,
+        _smear_grid(s, nsigma=nsigma, steps=steps)
+    )[0]
+
+
+def _norm_conv_poisson(k, l, s, smear_grid):
+    """Array version of `norm_conv_poisson`, for 1d arrays `k`, `l` and `s`
+    (and the corresponding `_smear_grid`)"""
+    cp = _conv_poisson(k, l, s, smear_grid)
     n1 = np.exp(log_poisson(l, l))
-    n2 = conv_poisson(l, l, s, nsigma=nsigma, steps=steps)
+    n2 = _conv_poisson(l, l, s, smear_grid)
     return cp*n1/n2
 
 
@@ -478,16 +568,18 @@ def conv_llh(actual_values, expected_values):
     total log of convoluted poisson likelihood
 
     """
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigma = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
-    triplets = np.array([actual_values, expected_values, sigma]).T
-    norm_triplets = np.array([actual_values, actual_values, sigma]).T
-    total = 0
-    for i in range(len(triplets)):
-        total += np.log(max(SMALL_POS, norm_conv_poisson(*triplets[i]))) # FIXME? (cf. pylint)
-        total -= np.log(max(SMALL_POS, norm_conv_poisson(*norm_triplets[i]))) # FIXME? (cf. pylint)
-    return total
+    actual_values = _nominal_values(actual_values).ravel()
+    sigma = _std_devs(expected_values).ravel()
+    expected_values = _nominal_values(expected_values).ravel()
+    # Evaluate all bins at once (`fmax` also replaces NaNs, like `max` did when
+    # looping over the bins), with the same smearing terms for all convolutions
+    smear_grid = _smear_grid(sigma, nsigma=3, steps=50)
+    conv = _norm_conv_poisson(actual_values, expected_values, sigma, smear_grid)
+    norm_conv = _norm_conv_poisson(actual_values, actual_values, sigma,
+                                   smear_grid)
+    return np.sum(
+        np.log(np.fmax(SMALL_POS, conv)) - np.log(np.fmax(SMALL_POS, norm_conv))
+    )
 
 def barlow_llh(actual_values, expected_values):
     """Compute the Barlow LLH taking into account finite statistics.
@@ -502,9 +594,9 @@ def barlow_llh(actual_values, expected_values):
 
     """
 
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigmas = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
+    sigmas = _std_devs(expected_values).ravel()
+    expected_values = _nominal_values(expected_values).ravel()
 
     with np.errstate(invalid='ignore'):
         # Mask off any nan expected values (these are assumed to be ok)
@@ -535,12 +627,36 @@ def barlow_llh(actual_values, expected_values):
 
     # TODO(tahmid): Run checks in case expected_values and/or corresponding sigma == 0
     # and handle these appropriately. If sigma/ev == 0 the code below will fail.
-    unweighted = np.array([(ev/s)**2 for ev, s in zip(expected_values, sigmas)])
-    weights = np.array([s**2/ev for ev, s in zip(expected_values, sigmas)])
+    # (masked expected values give nan, as converting masked elements did when
+    # building these element by element)
+    expected_data = np.ma.getdata(expected_values)
+    expected_mask = np.ma.getmaskarray(expected_values)
+    unweighted = np.square(expected_data / sigmas)
+    unweighted[expected_mask] = np.nan
+    weights = np.square(sigmas) / expected_data
+    weights[expected_mask] = np.nan
 
     llh_val = likelihood_functions.barlowLLH(actual_values, unweighted, weights)
     return llh_val
 
+def _clipped_values_and_std_devs(expected_values):
+    """Flattened nominal values and standard deviations of `expected_values`,
+    with the values clipped to [SMALL_POS, inf] (in new arrays, not in the
+    caller's). As when clipping numbers with uncertainties, clipped values have
+    no uncertainty, and nan nominal values are clipped too in that case."""
+    has_uncertainties = not isbarenumeric(expected_values)
+    sigma = _std_devs(expected_values).ravel()
+    expected_values = _nominal_values(expected_values).ravel()
+    with np.errstate(invalid='ignore'):
+        if has_uncertainties:
+            clipped = ~(expected_values >= SMALL_POS)
+        else:
+            clipped = expected_values < SMALL_POS
+    expected_values[clipped] = SMALL_POS
+    sigma[clipped] = 0.
+    return expected_values, sigma
+
+
 def mod_chi2(actual_values, expected_values):
     """Compute the chi-square value taking into account uncertainty terms
     (incl. e.g. finite stats)
@@ -556,12 +672,8 @@ def mod_chi2(actual_values, expected_values):
         the inputs
 
     """
-    # Replace 0's with small positive numbers to avoid inf in log
-    np.clip(expected_values, a_min=SMALL_POS, a_max=np.inf,
-            out=expected_values)
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigma = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
+    expected_values, sigma = _clipped_values_and_std_devs(expected_values)
     m_chi2 = (
         (actual_values - expected_values)**2 / (sigma**2 + expected_values)
     )
@@ -581,12 +693,8 @@ def signed_sqrt_mod_chi2(actual_values, expected_values):
         the inputs
 
     """
-    # Replace 0's with small positive numbers to avoid inf in log
-    np.clip(expected_values, a_min=SMALL_POS, a_max=np.inf,
-            out=expected_values)
-    actual_values = unp.nominal_values(actual_values).ravel()
-    sigma = unp.std_devs(expected_values).ravel()
-    expected_values = unp.nominal_values(expected_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
+    expected_values, sigma = _clipped_values_and_std_devs(expected_values)
     m_pull = (
         (actual_values - expected_values) / np.sqrt(sigma**2 + expected_values)
     )
@@ -626,17 +734,27 @@ def generalized_poisson_llh(actual_values, expected_values=None, empty_bins=None
 
     num_bins = actual_values.flatten().shape[0]
     llh_per_bin = np.zeros(num_bins)
-    actual_values = unp.nominal_values(actual_values).ravel()
+    actual_values = _nominal_values(actual_values).ravel()
 
     # If no empty bins are specified, we assume that all of them should be included
     if empty_bins is None:
         empty_bins = []
+    empty_bins = set(empty_bins)
+
+    # TODO: sometimes the histogram spits out uncertainty objects, sometimes not. 
+    #       Not sure why.
+    data_counts = actual_values.astype(np.int64)
+
+    # Flatten the histograms of each set of maps once, with dimensions [maps, bins],
+    # rather than flattening every map again for each bin
+    all_weight_sums = np.array([m.hist.flatten() for m in expected_values['weights'].maps])
+    all_n_mc_events = np.array([m.hist.flatten() for m in expected_values['n_mc_events'].maps])
+    all_alphas = np.array([m.hist.flatten() for m in expected_values['llh_alphas'].maps])
+    all_betas = np.array([m.hist.flatten() for m in expected_values['llh_betas'].maps])
 
     for bin_i in range(num_bins):
 
-        # TODO: sometimes the histogram spits out uncertainty objects, sometimes not. 
-        #       Not sure why.
-        data_count = actual_values.astype(np.int64)[bin_i]
+        data_count = data_counts[bin_i]
 
         # Automatically add a huge number if a bin has non zero data count
         # but completely empty MC
@@ -646,7 +764,7 @@ def generalized_poisson_llh(actual_values, expected_values=None, empty_bins=None
             continue
 
         # Make sure that no weight sum is negative. Crash if there are
-        weight_sum = np.array([m.hist.flatten()[bin_i] for m in expected_values['weights'].maps])
+        weight_sum = all_weight_sums[:, bin_i]
         if (weight_sum<0).sum()>0:
             logging.debug('\n\n\n')
             logging.debug('weights that are causing problem: ')
@@ -658,7 +776,7 @@ def generalized_poisson_llh(actual_values, expected_values=None, empty_bins=None
         #
         # If the number of MC events is high, compute a normal poisson probability
         #
-        n_mc_events = np.array([m.hist.flatten()[bin_i] for m in expected_values['n_mc_events'].maps])
+        n_mc_events = all_n_mc_events[:, bin_i]
         if np.all(n_mc_events>100):
 
             logP = data_count*np.log(weight_sum.sum())-weight_sum.sum()-(data_count*np.log(data_count)-data_count)
@@ -667,8 +785,8 @@ def generalized_poisson_llh(actual_values, expected_values=None, empty_bins=None
         else:
             from pisa.utils.llh_defs.poisson import fast_pgmix
 
-            alphas = np.array([m.hist.flatten()[bin_i] for m in expected_values['llh_alphas'].maps])
-            betas  = np.array([m.hist.flatten()[bin_i] for m in expected_values['llh_betas'].maps])
+            alphas = all_alphas[:, bin_i]
+            betas = all_betas[:, bin_i]
 
             # Remove the NaN's 
             mask = np.isfinite(alphas)*np.isfinite(betas)